@@ -1,14 +1,21 @@
+import click
 from flask import Flask
 from flask_restx import Api
 
-from config import Config
+from config import Config, get_config
 from dao.model.user import User
-from implemented import user_service
-from setup_db import db
+from implemented import import_service, suggest_service, user_service
+from migrations import migrate
+from replica import register_replica
+from service.imports import Utf8Lines, detect_format
+from setup_db import db, register_sqlite_pragmas
 from views.auth import auth_ns
+from views.cache import cache_ns
 from views.directors import director_ns
 from views.genres import genre_ns
+from views.imports import import_ns
 from views.movies import movie_ns
+from views.suggest import suggest_ns
 from views.user import user_ns
 
 
@@ -21,16 +28,23 @@ def create_app(config_object: Config) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config_object)
     register_extensions(app)
+    register_commands(app)
     return app
 
 
 def register_extensions(app: Flask) -> None:
     """
-    Функция производит инициализацию базы данных и создание API.
+    Функция производит инициализацию базы данных, настройку соединений SQLite,
+    подключение реплики для чтения, построение индексов подсказок и создание API.
+    Миграции не применяются: импорт приложения не изменяет базу данных (см. команду flask migrate).
     :param app: Сконфигурированное Flask-приложение.
     :return: None
     """
     db.init_app(app)
+    register_sqlite_pragmas(app)
+    register_replica(app)
+    with app.app_context():
+        suggest_service.build_all()
     api = Api(app)
     # create_data(app, db)
     api.add_namespace(director_ns)
@@ -38,6 +52,48 @@ def register_extensions(app: Flask) -> None:
     api.add_namespace(movie_ns)
     api.add_namespace(user_ns)
     api.add_namespace(auth_ns)
+    api.add_namespace(cache_ns)
+    api.add_namespace(import_ns)
+    api.add_namespace(suggest_ns)
+
+
+def register_commands(app: Flask) -> None:
+    """
+    Функция производит регистрацию консольных команд Flask (FLASK_APP=app flask migrate, flask import-data ...).
+    :param app: Сконфигурированное Flask-приложение.
+    :return: None
+    """
+    @app.cli.command('migrate')
+    def migrate_command() -> None:
+        """
+        Применение миграций к базе данных: индексы, полнотекстовый поиск, сводная таблица статистики.
+        """
+        migrate(app)
+        click.echo('migrations applied')
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(sorted(import_service.targets)))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    def import_data_command(kind: str, path: str) -> None:
+        """
+        Массовая загрузка фильмов, режиссеров или жанров из файла JSON Lines или CSV.
+        """
+        report = import_data(app, kind, path)
+        click.echo(f"imported: {report['imported']}, failed: {report['failed']}")
+        for error in report['errors']:
+            click.echo(f"line {error['line']}: {error['messages']}", err=True)
+
+
+def import_data(app: Flask, kind: str, path: str) -> dict:
+    """
+    Функция производит массовую загрузку данных из файла JSON Lines или CSV (формат определяется по расширению)
+    :param app: Сконфигурированное Flask-приложение
+    :param kind: Название таблицы: movies, directors или genres
+    :param path: Путь к файлу
+    :return: Отчет о загрузке
+    """
+    with app.app_context(), open(path, 'rb') as file:
+        return import_service.import_lines(kind, Utf8Lines(file), detect_format(path))
 
 
 def create_data(app: Flask, db) -> None:
@@ -58,8 +114,8 @@ def create_data(app: Flask, db) -> None:
             db.session.add_all([u1, u2, u3])
 
 
-app = create_app(Config())
-app.debug = True
+app = create_app(get_config())
 
 if __name__ == '__main__':
+    migrate(app)
     app.run(host="localhost", port=10001, debug=True)
@@ -0,0 +1,171 @@
+"""
+Асинхронный режим работы приложения (ASGI).
+
+Все пространства имен API (movies, genres, directors, users, auth и остальные) обслуживаются тем же
+Flask-приложением из app.py через адаптер asgiref WsgiToAsgi. Самые частые запросы чтения
+(GET /movies/id, /genres/, /genres/id, /directors/, /directors/id без квери-параметров) выполняются
+асинхронно: DAO вызываются через AsyncDAO в асинхронных сессиях SQLAlchemy с драйвером aiosqlite,
+поэтому ожидание базы данных не занимает поток, а количество одновременных запросов на процесс
+ограничено не пулом потоков, а пулом соединений (ASGI_DB_POOL_SIZE).
+Ответы асинхронных маршрутов совпадают с ответами Flask-приложения, включая ETag и Last-Modified.
+Запросы с If-None-Match, без токена или с недействительным токеном передаются
+Flask-приложению, которое возвращает HTTP-код 304 или 401 (If-Modified-Since не учитывается, см. conditional_get).
+
+Для работы нужны дополнительные зависимости:
+    pip install -r requirements-asgi.txt
+
+Запуск (миграции применяются отдельно, при импорте приложения база данных не изменяется):
+    FLASK_APP=app flask migrate
+    uvicorn asgi:app --port 10001
+"""
+import json
+import os
+import re
+
+try:
+    import aiosqlite  # noqa: F401 (драйвер sqlite+aiosqlite)
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError as e:
+    raise ImportError('ASGI mode requires optional dependencies: pip install -r requirements-asgi.txt') from e
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app import app as flask_app
+from dao.aio import AsyncDAO
+from dao.director import DirectorDAO
+from dao.genre import GenreDAO
+from dao.movie import MovieDAO
+from helpers import decode_token, version_headers
+from implemented import director_dao, genre_dao, movie_dao
+from setup_db import db, listen_sqlite_pragmas
+from views.directors import director_schema, directors_schema
+from views.genres import genre_schema, genres_schema
+from views.movies import get_movie_schema
+
+
+def create_sessions(url, pragmas: dict, pool_size: int):
+    """
+    Функция создает фабрику асинхронных сессий для базы данных SQLite с драйвером aiosqlite.
+    :param url: Адрес базы данных SQLAlchemy (URL синхронного engine приложения).
+    :param pragmas: PRAGMA, выполняемые при открытии соединения (см. Config.SQLITE_PRAGMAS).
+    :param pool_size: Количество соединений в пуле.
+    :return: Кортеж (AsyncEngine, фабрика сессий).
+    """
+    engine = create_async_engine(url.set(drivername='sqlite+aiosqlite'),
+                                 poolclass=AsyncAdaptedQueuePool, pool_size=pool_size, max_overflow=0)
+    listen_sqlite_pragmas(engine.sync_engine, pragmas)
+    # Объекты остаются загруженными после commit: сериализуются уже после закрытия сессии
+    return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class AsyncReadApp:
+    """
+    Класс описывает ASGI-приложение, которое выполняет маршруты чтения асинхронно,
+    а остальные запросы передает WSGI-приложению Flask (в пуле потоков asgiref).
+    """
+
+    def __init__(self, wsgi_app, engine, sessions):
+        """
+        Метод инициализирует приложение и таблицу асинхронных маршрутов.
+        :param wsgi_app: Flask-приложение.
+        :param engine: AsyncEngine базы данных.
+        :param sessions: Фабрика асинхронных сессий.
+        """
+        self.wsgi_app = wsgi_app
+        self.fallback = WsgiToAsgi(wsgi_app)
+        self.engine = engine
+        movies = AsyncDAO(MovieDAO, sessions)
+        genres = AsyncDAO(GenreDAO, sessions)
+        directors = AsyncDAO(DirectorDAO, sessions)
+        # (шаблон пути, кеширующие DAO для ETag - как в conditional_get маршрута Flask, корутина загрузки, сериализатор)
+        self.routes = [
+            (re.compile(r'/movies/(\d+)'), (movie_dao, director_dao, genre_dao), movies.get_one, get_movie_schema(())),
+            (re.compile(r'/genres/'), (genre_dao,), genres.get_all, genres_schema),
+            (re.compile(r'/genres/(\d+)'), (genre_dao,), genres.get_one, genre_schema),
+            (re.compile(r'/directors/'), (director_dao,), directors.get_all, directors_schema),
+            (re.compile(r'/directors/(\d+)'), (director_dao,), directors.get_one, director_schema),
+        ]
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET' and not scope['query_string']:
+            headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+            if self.authorized(headers) and 'if-none-match' not in headers:
+                for pattern, daos, load, schema in self.routes:
+                    match = pattern.fullmatch(scope['path'])
+                    if match:
+                        await self.read(send, scope['path'], headers, daos, load, schema, *map(int, match.groups()))
+                        return
+        await self.fallback(scope, receive, send)
+
+    async def lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    def authorized(headers: dict) -> bool:
+        """
+        Метод проверяет токен так же, как декоратор helpers.auth_required.
+        :param headers: Заголовки запроса (названия в нижнем регистре).
+        :return: True, если токен действителен.
+        """
+        if 'authorization' not in headers:
+            return False
+        try:
+            decode_token(headers['authorization'].split('Bearer ')[-1])
+        except Exception:
+            return False
+        return True
+
+    async def read(self, send, path: str, headers: dict, daos: tuple, load, schema, *args) -> None:
+        """
+        Метод выполняет асинхронный маршрут чтения и отправляет ответ в формате flask-restx.
+        :param send: Функция отправки сообщений ASGI.
+        :param path: Путь запроса.
+        :param headers: Заголовки запроса.
+        :param daos: Кеширующие DAO таблиц (версии данных для ETag).
+        :param load: Корутина загрузки данных.
+        :param schema: Сериализатор.
+        :param args: Параметры пути (id записи).
+        """
+        versions = [dao.version() for dao in daos]
+        _, _, cache_headers = version_headers(versions, f'{path}?', headers.get('accept'))
+        result = await load(*args)
+        if result is None:
+            status, body, cache_headers = 404, '', {}
+        else:
+            status, body = 200, schema.dump(result)
+        content = self.dumps(body)
+        response_headers = [(b'content-type', b'application/json'), (b'content-length', str(len(content)).encode())]
+        response_headers += [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                             for name, value in cache_headers.items()]
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def dumps(self, data) -> bytes:
+        # Формат ответа flask-restx (representations.output_json)
+        settings = dict(self.wsgi_app.config.get('RESTX_JSON', {}))
+        if self.wsgi_app.debug:
+            settings.setdefault('indent', 4)
+        return (json.dumps(data, **settings) + '\n').encode('utf-8')
+
+
+# URL берется из engine Flask-SQLAlchemy: относительный путь к файлу SQLite в нем уже отсчитан от каталога приложения
+with flask_app.app_context():
+    database_url = db.get_engine(flask_app).url
+async_engine, async_sessions = create_sessions(
+    database_url,
+    flask_app.config.get('SQLITE_PRAGMAS') or {},
+    int(os.environ.get('ASGI_DB_POOL_SIZE', 8)),
+)
+app = AsyncReadApp(flask_app, async_engine, async_sessions)
@@ -0,0 +1,148 @@
+"""
+Нагрузочный тест синхронного (WSGI, многопоточный сервер Werkzeug) и асинхронного (ASGI, uvicorn, asgi.py)
+режимов работы приложения в одном процессе сервера: пропускная способность, задержка и количество потоков
+процесса сервера при разном количестве одновременных запросов. Сервер работает с базой данных проекта movies.db,
+тест выполняет только запросы чтения.
+
+Для асинхронного режима нужны зависимости из requirements-asgi.txt.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_asgi --concurrency 16 64 256 --requests 3000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import jwt
+
+from constants import JWT_ALGORITHM, JWT_SECRET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = [f'/movies/{i}' for i in range(1, 21)] + ['/genres/', '/directors/']
+SERVERS = {
+    'wsgi': [sys.executable, '-c', 'import sys; from app import app; app.run(port=int(sys.argv[1]), threaded=True)'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--log-level', 'warning', '--port'],
+}
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    """
+    Функция запускает сервер в отдельном процессе и ждет, пока он начнет принимать соединения.
+    :param mode: Режим: wsgi или asgi.
+    :param port: Порт сервера.
+    :return: Процесс сервера.
+    """
+    env = {**os.environ, 'APP_CONFIG': 'production', 'REPLICA_DATABASE_URI': ''}
+    process = subprocess.Popen(SERVERS[mode] + [str(port)], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            asyncio.run(request(port, '/genres/', {}))
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def thread_count(pid: int) -> int:
+    """
+    Функция возвращает количество потоков процесса (Linux, /proc).
+    :param pid: id процесса.
+    :return: Количество потоков или 0, если оно недоступно.
+    """
+    try:
+        with open(f'/proc/{pid}/status') as file:
+            for line in file:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+async def request(port: int, path: str, headers: dict) -> int:
+    """
+    Функция отправляет GET-запрос в отдельном соединении и читает ответ целиком.
+    :param port: Порт сервера.
+    :param path: Путь запроса.
+    :param headers: Заголовки запроса.
+    :return: HTTP-код ответа.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f'GET {path} HTTP/1.1', f'Host: 127.0.0.1:{port}', 'Connection: close']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(port: int, pid: int, concurrency: int, total: int, headers: dict) -> dict:
+    """
+    Функция выполняет total запросов, из которых одновременно выполняется не больше concurrency.
+    :param port: Порт сервера.
+    :param pid: id процесса сервера (для подсчета потоков).
+    :param concurrency: Количество одновременных запросов.
+    :param total: Общее количество запросов.
+    :param headers: Заголовки запросов.
+    :return: Словарь с пропускной способностью, задержками, ошибками и максимальным количеством потоков.
+    """
+    latencies, errors, threads = [], 0, [thread_count(pid)]
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for number in counter:
+            started = time.perf_counter()
+            try:
+                status = await request(port, PATHS[number % len(PATHS)], headers)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+            if number % 100 == 0:
+                threads.append(thread_count(pid))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+        'errors': errors,
+        'threads': max(threads),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--requests', type=int, default=3_000)
+    parser.add_argument('--port', type=int, default=18_001)
+    args = parser.parse_args()
+
+    token = jwt.encode({'username': 'bench', 'role': 'admin', 'exp': int(time.time()) + 3600},
+                       JWT_SECRET, algorithm=JWT_ALGORITHM)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f'{"mode":<6}{"concurrency":>12}{"req/s":>10}{"p50, ms":>10}{"p99, ms":>10}{"errors":>8}{"threads":>9}')
+    for mode in SERVERS:
+        process = start_server(mode, args.port)
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(load(args.port, process.pid, concurrency, args.requests, headers))
+                print(f'{mode:<6}{concurrency:>12}{result["rps"]:>10.0f}{result["p50"]:>10.1f}'
+                      f'{result["p99"]:>10.1f}{result["errors"]:>8}{result["threads"]:>9}')
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Бенчмарк накладных расходов декоратора auth_required на один запрос:
+проверка подписи JWT при каждом запросе (кеш очищается) и с кешем проверенных токенов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_auth --repeat 20000
+"""
+import argparse
+import time
+
+import jwt
+from flask import Flask
+
+from constants import JWT_SECRET, JWT_ALGORITHM
+from helpers import auth_required, token_cache
+
+
+@auth_required
+def endpoint():
+    return None
+
+
+def measure(repeat: int, cached: bool) -> float:
+    """
+    Функция измеряет среднее время вызова декорированной функции.
+    :param repeat: Количество вызовов.
+    :param cached: Использовать кеш проверенных токенов.
+    :return: Среднее время вызова в микросекундах.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if not cached:
+            token_cache.clear()
+        endpoint()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20_000)
+    args = parser.parse_args()
+
+    token = jwt.encode({'username': 'vasya', 'role': 'user', 'exp': int(time.time()) + 1800},
+                       JWT_SECRET, algorithm=JWT_ALGORITHM)
+    app = Flask(__name__)
+    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        before = measure(args.repeat, cached=False)
+        after = measure(args.repeat, cached=True)
+
+    print(f'jwt.decode on every request: {before:8.2f} us')
+    print(f'verified token cache:        {after:8.2f} us')
+    print(f'speedup:                     {before / after:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Бенчмарк фильтрованных запросов к таблицам movie и user до и после создания индексов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_indexes --rows 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from dao.model.movie import Movie
+from dao.model.user import User
+from dao.movie import MovieDAO, MovieQuery
+from dao.user import UserDAO
+from migrations import create_indexes
+from setup_db import db
+
+
+def fill(engine, rows: int) -> None:
+    """
+    Функция создает таблицы без индексов и заполняет их синтетическими данными.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество фильмов и пользователей.
+    """
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f'DROP INDEX {index.name}'))
+        connection.execute(Movie.__table__.insert(), [
+            {'id': i, 'title': f'Movie {i}', 'description': 'x' * 200, 'trailer': 'https://example.com',
+             'year': random.randint(1950, 2022), 'rating': round(random.uniform(1, 10), 1),
+             'genre_id': random.randint(1, 20), 'director_id': random.randint(1, rows // 10 or 1)}
+            for i in range(1, rows + 1)
+        ])
+        connection.execute(User.__table__.insert(), [
+            {'id': i, 'username': f'user{i}', 'password': 'hash', 'role': 'user'} for i in range(1, rows + 1)
+        ])
+
+
+def measure(engine, rows: int, repeat: int) -> dict:
+    """
+    Функция измеряет среднее время фильтрованных запросов через DAO.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество записей в таблицах.
+    :param repeat: Количество повторений каждого запроса.
+    :return: Словарь {название запроса: среднее время в миллисекундах}.
+    """
+    cases = {
+        'movies by director_id': lambda dao, _: dao.get_filtered(
+            MovieQuery().equal('director_id', random.randint(1, rows // 10 or 1))),
+        'movies by genre_id + year': lambda dao, _: dao.get_filtered(
+            MovieQuery().equal('genre_id', random.randint(1, 20)).equal('year', random.randint(1950, 2022))),
+        'movies by year range': lambda dao, _: dao.get_filtered(
+            MovieQuery().between('year', 2000, 2001)),
+        'user by username': lambda _, user_dao: user_dao.get_by_username(f'user{random.randint(1, rows)}'),
+    }
+    result = {}
+    with Session(engine) as session:
+        movie_dao, user_dao = MovieDAO(session), UserDAO(session)
+        for name, case in cases.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                case(movie_dao, user_dao)
+                session.expunge_all()
+            result[name] = (time.perf_counter() - started) / repeat * 1000
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "bench.db")}')
+        fill(engine, args.rows)
+        before = measure(engine, args.rows, args.repeat)
+        create_indexes(engine)
+        after = measure(engine, args.rows, args.repeat)
+
+    print(f'{"query":<28}{"before, ms":>12}{"after, ms":>12}{"speedup":>10}')
+    for name in before:
+        print(f'{name:<28}{before[name]:>12.3f}{after[name]:>12.3f}{before[name] / after[name]:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
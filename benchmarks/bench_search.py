@@ -0,0 +1,93 @@
+"""
+Бенчмарк поиска фильмов по тексту: LIKE по названию и описанию (полный просмотр таблицы)
+и полнотекстовый индекс FTS5 с ранжированием bm25 (MovieDAO.search).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_search --rows 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import Session
+
+from dao.model.movie import Movie
+from dao.movie import MovieDAO
+from migrations import create_movie_search
+from setup_db import db
+
+WORDS = ['космос', 'любовь', 'война', 'детектив', 'охотник', 'дракон', 'город', 'море', 'тайна', 'семья',
+         'робот', 'ограбление', 'путешествие', 'остров', 'король', 'музыка', 'зима', 'поезд', 'пустыня', 'призрак']
+
+
+def fill(engine, rows: int) -> None:
+    """
+    Функция создает таблицы и заполняет таблицу movie фильмами со случайными названиями и описаниями.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество фильмов.
+    """
+    vocabulary = WORDS + [f'слово{i}' for i in range(5_000)]
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Movie.__table__.insert(), [
+            {'id': i, 'title': ' '.join(random.choices(vocabulary, k=3)),
+             'description': ' '.join(random.choices(vocabulary, k=30)), 'trailer': 'https://example.com',
+             'year': random.randint(1950, 2022), 'rating': round(random.uniform(1, 10), 1),
+             'genre_id': random.randint(1, 20), 'director_id': random.randint(1, 1000)}
+            for i in range(1, rows + 1)
+        ])
+
+
+def measure(search, words: list, repeat: int) -> float:
+    """
+    Функция измеряет среднее время поиска первой страницы результатов.
+    :param search: Функция поиска, принимающая слово.
+    :param words: Искомые слова.
+    :param repeat: Количество повторений.
+    :return: Среднее время в миллисекундах.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        search(random.choice(words))
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "bench.db")}')
+        fill(engine, args.rows)
+        started = time.perf_counter()
+        create_movie_search(engine)
+        print(f'{"FTS5 index build:":<26}{time.perf_counter() - started:8.2f} s')
+
+        with Session(engine) as session:
+            dao = MovieDAO(session)
+
+            def like(word: str) -> list:
+                pattern = f'%{word}%'
+                return (session.query(Movie).filter(or_(Movie.title.like(pattern), Movie.description.like(pattern)))
+                        .order_by(Movie.id).limit(args.limit).all())
+
+            def fts(word: str) -> list:
+                return dao.search(dao.match_expression(word, 10), limit=args.limit)
+
+            # Частое слово встречается примерно в 1% фильмов, редкого слова нет ни в одном фильме
+            rare = [f'редкое{i}' for i in range(100)]
+            for name, words in (('frequent word', WORDS), ('rare word', rare)):
+                print(f'{name + ", LIKE:":<26}{measure(like, words, args.repeat):8.2f} ms')
+                print(f'{name + ", FTS5 + bm25:":<26}{measure(fts, words, args.repeat):8.2f} ms')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
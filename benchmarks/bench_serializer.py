@@ -0,0 +1,73 @@
+"""
+Бенчмарк сериализации списков фильмов, режиссеров и жанров:
+метод dump сериализатора marshmallow и скомпилированный сериализатор (dao/model/serializer.py).
+Перед измерением проверяется, что результаты совпадают.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_serializer --rows 100000
+"""
+import argparse
+import random
+import time
+
+from dao.model.director import Director, DirectorSchema
+from dao.model.genre import Genre, GenreSchema
+from dao.model.movie import Movie, MovieSchema
+from dao.model.serializer import compile_schema
+
+
+def make_movies(rows: int) -> list[Movie]:
+    """
+    Функция создает синтетические записи о фильмах со связанными режиссерами и жанрами.
+    :param rows: Количество фильмов.
+    :return: Список фильмов.
+    """
+    directors = [Director(id=i, name=f'Director {i}') for i in range(1, 101)]
+    genres = [Genre(id=i, name=f'Genre {i}') for i in range(1, 21)]
+    return [
+        Movie(id=i, title=f'Movie {i}', description='x' * 200, trailer='https://example.com', year=1950 + i % 70,
+              rating=round(random.uniform(1, 10), 1), director=random.choice(directors), genre=random.choice(genres))
+        for i in range(1, rows + 1)
+    ]
+
+
+def measure(schema, objects: list, repeat: int) -> float:
+    """
+    Функция измеряет скорость сериализации.
+    :param schema: Сериализатор с методом dump и параметром many=True.
+    :param objects: Сериализуемые объекты.
+    :param repeat: Количество повторений.
+    :return: Количество объектов в секунду.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        schema.dump(objects)
+    return len(objects) * repeat / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    movies = make_movies(args.rows)
+    cases = {
+        'movies': (MovieSchema(many=True, exclude=('director', 'genre')), movies),
+        'movies?expand=director,genre': (MovieSchema(many=True), movies),
+        'directors': (DirectorSchema(many=True), [movie.director for movie in movies]),
+        'genres': (GenreSchema(many=True), [movie.genre for movie in movies]),
+    }
+
+    print(f'{"list":<30}{"marshmallow, rows/s":>22}{"compiled, rows/s":>20}{"speedup":>10}')
+    for name, (schema, objects) in cases.items():
+        fast_schema = compile_schema(schema)
+        assert fast_schema.dump(objects) == schema.dump(objects), name
+        before = measure(schema, objects, args.repeat)
+        after = measure(fast_schema, objects, args.repeat)
+        print(f'{name:<30}{before:>22,.0f}{after:>20,.0f}{after / before:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Нагрузочный тест запуска приложения одним процессом (многопоточный сервер Werkzeug, app.run)
+и пулом процессов с общим прогревом (server.py) при разном количестве воркеров:
+- холодный старт - время первого запроса к маршрутам, которые загружают индексы в память
+  (похожие фильмы, лучшие фильмы, подсказки), сразу после запуска сервера;
+- пропускная способность и задержка на запросах чтения (см. benchmarks.bench_asgi).
+Сервер работает с базой данных проекта movies.db, тест выполняет только запросы чтения.
+Рост пропускной способности с количеством воркеров ограничен количеством ядер процессора.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_server --workers 1 2 4 --concurrency 64 --requests 3000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import jwt
+
+from benchmarks.bench_asgi import load, request
+from constants import JWT_ALGORITHM, JWT_SECRET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLD_PATHS = ['/movies/1/similar', '/movies/top?limit=10', '/suggest/?prefix=a']
+
+
+def start_server(command: list) -> tuple:
+    """
+    Функция запускает сервер в отдельном процессе и ждет, пока он начнет принимать соединения.
+    :param command: Команда запуска сервера.
+    :return: Кортеж (процесс сервера, время запуска в секундах).
+    """
+    env = {**os.environ, 'APP_CONFIG': 'production', 'REPLICA_DATABASE_URI': ''}
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    port = int(command[-1])
+    for _ in range(300):
+        try:
+            asyncio.run(request(port, '/genres/', {}))
+            return process, time.perf_counter() - started
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f'{command} did not start')
+
+
+def cold_start(port: int, headers: dict) -> float:
+    """
+    Функция выполняет по одному запросу к маршрутам COLD_PATHS.
+    :param port: Порт сервера.
+    :param headers: Заголовки запросов.
+    :return: Максимальное время ответа в миллисекундах.
+    """
+    latencies = []
+    for path in COLD_PATHS:
+        started = time.perf_counter()
+        asyncio.run(request(port, path, headers))
+        latencies.append(time.perf_counter() - started)
+    return max(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=3_000)
+    parser.add_argument('--port', type=int, default=18_011)
+    args = parser.parse_args()
+
+    token = jwt.encode({'username': 'bench', 'role': 'admin', 'exp': int(time.time()) + 3600},
+                       JWT_SECRET, algorithm=JWT_ALGORITHM)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    servers = {'app.run': [sys.executable, '-c', 'import sys; from app import app; '
+                                                 'app.run(port=int(sys.argv[1]), threaded=True)', str(args.port)]}
+    for workers in args.workers:
+        servers[f'prefork x{workers}'] = [sys.executable, 'server.py', '--workers', str(workers),
+                                          '--port', str(args.port)]
+
+    print(f'{os.cpu_count()} CPU')
+    print(f'{"server":<12}{"start, s":>10}{"first, ms":>11}{"req/s":>10}{"p50, ms":>10}{"p99, ms":>10}{"errors":>8}')
+    for name, command in servers.items():
+        process, startup = start_server(command)
+        try:
+            first = cold_start(args.port, headers)
+            result = asyncio.run(load(args.port, process.pid, args.concurrency, args.requests, headers))
+            print(f'{name:<12}{startup:>10.2f}{first:>11.1f}{result["rps"]:>10.0f}{result["p50"]:>10.1f}'
+                  f'{result["p99"]:>10.1f}{result["errors"]:>8}')
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Бенчмарк расчета похожих фильмов (service/similar.py): векторная оценка по массивам NumPy каталога (Catalog.top),
+цикл Python по строкам каталога с той же формулой и время изменения каталога при записи фильма.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_similar --rows 1000000
+"""
+import argparse
+import heapq
+import random
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from constants import SIMILAR_DEFAULT_LIMIT, SIMILAR_WEIGHTS, SIMILAR_YEAR_SCALE
+from service.similar import Catalog
+
+MovieRow = namedtuple('MovieRow', ('id', 'genre_id', 'director_id', 'year', 'rating'))
+
+
+def make_catalog(rows: int) -> Catalog:
+    """
+    Функция создает синтетический каталог фильмов.
+    :param rows: Количество фильмов.
+    :return: Каталог.
+    """
+    generator = np.random.default_rng(0)
+    return Catalog(
+        np.arange(1, rows + 1, dtype=np.int64),
+        generator.integers(1, 21, rows, dtype=np.int32),
+        generator.integers(1, rows // 20 + 2, rows, dtype=np.int32),
+        generator.integers(1950, 2023, rows).astype(np.float32),
+        np.round(generator.uniform(1, 10, rows), 1).astype(np.float32),
+    )
+
+
+def python_top(rows: list, target: MovieRow, limit: int) -> list[tuple]:
+    """
+    Функция рассчитывает похожесть циклом Python по строкам (формула Catalog.scores).
+    :param rows: Строки каталога.
+    :param target: Фильм, для которого ищутся похожие.
+    :param limit: Количество фильмов.
+    :return: Список пар (id, оценка).
+    """
+    weights = SIMILAR_WEIGHTS
+
+    def score(row: MovieRow) -> float:
+        return (weights['rating'] * row.rating / 10 + weights['genre'] * (row.genre_id == target.genre_id)
+                + weights['director'] * (row.director_id == target.director_id)
+                + weights['year'] / (1 + abs(row.year - target.year) / SIMILAR_YEAR_SCALE))
+
+    return heapq.nlargest(limit, ((score(row), row.id) for row in rows if row.id != target.id))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=SIMILAR_DEFAULT_LIMIT)
+    args = parser.parse_args()
+
+    random.seed(0)
+    catalog = make_catalog(args.rows)
+    positions = [random.randrange(args.rows) for _ in range(args.repeat)]
+
+    started = time.perf_counter()
+    for position in positions:
+        catalog.top(position, args.limit, SIMILAR_WEIGHTS, SIMILAR_YEAR_SCALE)
+    vectorized = (time.perf_counter() - started) / args.repeat
+
+    rows = [MovieRow(*values) for values in zip(catalog.ids.tolist(), catalog.genre_ids.tolist(),
+                                                 catalog.director_ids.tolist(), catalog.years.tolist(),
+                                                 catalog.ratings.tolist())]
+    started = time.perf_counter()
+    for position in positions[:3]:
+        python_top(rows, rows[position], args.limit)
+    loop = (time.perf_counter() - started) / 3
+
+    movie = MovieRow(args.rows // 2, 1, 1, 2000, 5.0)
+    started = time.perf_counter()
+    catalog.replace(movie.id, movie)
+    update = time.perf_counter() - started
+
+    print(f'rows: {args.rows:,}')
+    print(f'NumPy scoring:    {vectorized * 1_000:8.2f} ms')
+    print(f'Python loop:      {loop * 1_000:8.2f} ms')
+    print(f'catalog update:   {update * 1_000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
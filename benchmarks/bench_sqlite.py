@@ -0,0 +1,139 @@
+"""
+Бенчмарк одновременного чтения и записи SQLite с конфигурацией по умолчанию (Config)
+и производственной конфигурацией (ProductionConfig: WAL, PRAGMA, пул соединений).
+Потоки-читатели выполняют запрос списка фильмов жанра, потоки-писатели - изменение рейтинга фильма.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_sqlite --rows 100000 --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from config import Config, ProductionConfig
+from dao.model.movie import Movie
+from setup_db import db, register_sqlite_pragmas
+
+
+def make_engine(config: Config, path: str):
+    """
+    Функция создает Engine SQLAlchemy так же, как приложение: из конфигурации и с PRAGMA из SQLITE_PRAGMAS.
+    :param config: Конфигурация Flask приложения.
+    :param path: Путь к файлу базы данных.
+    :return: Engine SQLAlchemy.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    register_sqlite_pragmas(app)
+    with app.app_context():
+        return db.get_engine(app)
+
+
+def fill(engine, rows: int) -> None:
+    """
+    Функция создает таблицы и заполняет таблицу movie синтетическими данными.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество фильмов.
+    """
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Movie.__table__.insert(), [
+            {'id': i, 'title': f'Movie {i}', 'description': 'x' * 200, 'trailer': 'https://example.com',
+             'year': random.randint(1950, 2022), 'rating': round(random.uniform(1, 10), 1),
+             'genre_id': random.randint(1, 20), 'director_id': random.randint(1, rows // 10 or 1)}
+            for i in range(1, rows + 1)
+        ])
+
+
+def run(engine, rows: int, readers: int, writers: int, seconds: float) -> dict:
+    """
+    Функция запускает потоки-читатели и потоки-писатели на заданное время.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество фильмов в таблице.
+    :param readers: Количество потоков-читателей.
+    :param writers: Количество потоков-писателей.
+    :param seconds: Длительность измерения.
+    :return: Словарь с количеством операций в секунду, задержкой чтения и количеством ошибок.
+    """
+    read_query = text('SELECT * FROM movie WHERE genre_id = :genre_id ORDER BY id LIMIT 50')
+    write_query = text('UPDATE movie SET rating = :rating WHERE id = :id')
+    latencies, counts = [], {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader() -> None:
+        local, errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(read_query, {'genre_id': random.randint(1, 20)}).fetchall()
+            except OperationalError:
+                errors += 1
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            counts['reads'] += len(local)
+            counts['errors'] += errors
+
+    def writer() -> None:
+        done, errors = 0, 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(write_query, {'rating': round(random.uniform(1, 10), 1),
+                                                     'id': random.randint(1, rows)})
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts['writes'] += done
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+    return {'reads/s': counts['reads'] / seconds, 'writes/s': counts['writes'] / seconds,
+            'read p99, ms': p99, 'errors': counts['errors']}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for name, config in (('Config', Config()), ('ProductionConfig', ProductionConfig())):
+            random.seed(0)
+            engine = make_engine(config, os.path.join(directory, f'{name}.db'))
+            fill(engine, args.rows)
+            results[name] = run(engine, args.rows, args.readers, args.writers, args.seconds)
+            engine.dispose()
+
+    print(f'{"":<18}' + ''.join(f'{metric:>15}' for metric in results['Config']))
+    for name, result in results.items():
+        print(f'{name:<18}' + ''.join(f'{value:>15,.1f}' for value in result.values()))
+
+
+if __name__ == '__main__':
+    main()
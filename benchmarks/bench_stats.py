@@ -0,0 +1,106 @@
+"""
+Бенчмарк статистики фильмов: GROUP BY по таблице movie и по сводной таблице movie_stats,
+а также стоимость записи в таблицу movie с триггерами, обновляющими movie_stats.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_stats --rows 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from dao.model.movie import Movie
+from dao.movie import MovieDAO
+from migrations import create_movie_stats
+from setup_db import db
+
+
+def fill(engine, rows: int) -> None:
+    """
+    Функция создает таблицы и заполняет таблицу movie синтетическими данными.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Количество фильмов.
+    """
+    db.metadata.create_all(engine, tables=[Movie.__table__])
+    with engine.begin() as connection:
+        connection.execute(Movie.__table__.insert(), make_rows(1, rows))
+
+
+def make_rows(first: int, rows: int) -> list[dict]:
+    """
+    Функция создает синтетические записи о фильмах.
+    :param first: id первой записи.
+    :param rows: Количество записей.
+    :return: Список словарей со значениями колонок.
+    """
+    return [
+        {'id': i, 'title': f'Movie {i}', 'description': 'x' * 200, 'trailer': 'https://example.com',
+         'year': random.randint(1950, 2022), 'rating': round(random.uniform(1, 10), 1),
+         'genre_id': random.randint(1, 20), 'director_id': random.randint(1, 2_000)}
+        for i in range(first, first + rows)
+    ]
+
+
+def insert(engine, rows: list[dict]) -> float:
+    """
+    Функция измеряет время записи фильмов одной транзакцией.
+    :param engine: Engine SQLAlchemy базы данных.
+    :param rows: Записи о фильмах.
+    :return: Время в миллисекундах.
+    """
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(Movie.__table__.insert(), rows)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(func, repeat: int) -> float:
+    """
+    Функция измеряет среднее время вызова функции.
+    :param func: Функция без параметров.
+    :param repeat: Количество повторений.
+    :return: Среднее время в миллисекундах.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "bench.db")}')
+        fill(engine, args.rows)
+
+        before = insert(engine, make_rows(args.rows + 1, 10_000))
+        started = time.perf_counter()
+        create_movie_stats(engine)
+        print(f'{"movie_stats build:":<40}{(time.perf_counter() - started) * 1000:10.1f} ms')
+
+        with Session(engine) as session:
+            dao = MovieDAO(session)
+            for group_by in (('genre_id',), ('genre_id', 'year'), ('director_id',)):
+                for materialized in (False, True):
+                    name = f'{",".join(group_by)}, {"movie_stats" if materialized else "movie"}:'
+                    elapsed = measure(lambda: dao.get_stats(group_by, materialized), args.repeat)
+                    print(f'{name:<40}{elapsed:10.1f} ms')
+
+        after = insert(engine, make_rows(args.rows + 10_001, 10_000))
+        print(f'{"insert 10000 rows without triggers:":<40}{before:10.1f} ms')
+        print(f'{"insert 10000 rows with triggers:":<40}{after:10.1f} ms')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Бенчмарк индекса подсказок PrefixIndex (service/suggest.py): время построения, объем памяти
+и задержка поиска по префиксу из 1-4 первых букв слова.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_suggest --rows 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from constants import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_KEY_LENGTH, SUGGEST_MAX_WORDS
+from service.suggest import PrefixIndex
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщэюя'
+
+
+def make_titles(rows: int) -> list[str]:
+    """
+    Функция создает синтетические названия фильмов из 1-6 случайных слов.
+    :param rows: Количество названий.
+    :return: Список названий.
+    """
+    words = [''.join(random.choices(ALPHABET, k=random.randint(3, 10))).capitalize() for _ in range(20_000)]
+    return [' '.join(random.choices(words, k=random.randint(1, 6))) for _ in range(rows)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=20_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    titles = make_titles(args.rows)
+
+    started = time.perf_counter()
+    index = PrefixIndex(SUGGEST_MAX_WORDS, SUGGEST_MAX_KEY_LENGTH)
+    index.load(enumerate(titles, start=1))
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for pk in range(1, 1_001):
+        index.add(pk, titles[-pk])
+    update = (time.perf_counter() - started) / 1_000
+
+    tracemalloc.start()
+    measured = PrefixIndex(SUGGEST_MAX_WORDS, SUGGEST_MAX_KEY_LENGTH)
+    measured.load(enumerate(titles, start=1))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    prefixes = [random.choice(titles).split()[0][:random.randint(1, 4)] for _ in range(args.queries)]
+    latencies = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.search(prefix, SUGGEST_DEFAULT_LIMIT)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    print(f'rows: {args.rows:,}, keys: {len(index.keys):,}')
+    print(f'build:        {build:8.2f} s')
+    print(f'update:       {update * 1_000_000:8.1f} us')
+    print(f'memory:       {memory / 2 ** 20:8.1f} MB')
+    print(f'search p50:   {latencies[len(latencies) // 2] * 1_000_000:8.1f} us')
+    print(f'search p99:   {latencies[int(len(latencies) * 0.99)] * 1_000_000:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,62 @@
+import os
+
+from sqlalchemy.pool import QueuePool
+
+
 class Config(object):
     DEBUG = True
     SECRET_HERE = '249y823r9v8238r9u'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///./movies.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JSON_AS_ASCII = False
+    # PRAGMA, выполняемые при открытии каждого соединения с SQLite (см. setup_db.register_sqlite_pragmas)
+    SQLITE_PRAGMAS = {}
+    # Реплика для чтения (см. replica.register_replica): например, REPLICA_DATABASE_URI=sqlite:///./replica.db
+    SQLALCHEMY_BINDS = {'replica': os.environ['REPLICA_DATABASE_URI']} if os.environ.get('REPLICA_DATABASE_URI') else {}
+    # Период синхронизации локальной реплики SQLite в секундах (0 - реплика синхронизируется извне)
+    REPLICA_SYNC_INTERVAL = float(os.environ.get('REPLICA_SYNC_INTERVAL', 2))
+    # Время после записи, в течение которого клиент читает из основной базы данных
+    REPLICA_STICKY_SECONDS = 5
+
+
+class ProductionConfig(Config):
+    """
+    Конфигурация для работы под нагрузкой.
+    - WAL: читатели не блокируются пишущей транзакцией, запись не ждет окончания чтения;
+    - synchronous=NORMAL: в режиме WAL fsync выполняется только при контрольной точке, без риска повреждения базы;
+    - cache_size, mmap_size: страничный кеш 64 МБ на соединение и чтение файла базы через mmap до 256 МБ;
+    - busy_timeout: ожидание блокировки записи вместо немедленной ошибки database is locked.
+    Соединения переиспользуются пулом QueuePool (по умолчанию для файла SQLite используется NullPool,
+    и соединение открывается заново на каждый запрос). Пул создается в каждом процессе сервера,
+    его размер задается на процесс и должен быть не меньше количества потоков процесса.
+    """
+    DEBUG = False
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64_000,
+        'mmap_size': 268_435_456,
+        'busy_timeout': 5_000,
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': QueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 8)),
+        'max_overflow': int(os.environ.get('DB_POOL_OVERFLOW', 8)),
+        'pool_timeout': 10,
+        'connect_args': {'check_same_thread': False, 'timeout': 5},
+    }
+
+
+CONFIGS = {
+    'development': Config,
+    'production': ProductionConfig,
+}
+
 
+def get_config() -> Config:
+    """
+    Функция возвращает конфигурацию, выбранную переменной окружения APP_CONFIG (development или production).
+    :return: Конфигурация Flask приложения
+    """
+    return CONFIGS[os.environ.get('APP_CONFIG', 'development')]()
@@ -1,4 +1,36 @@
+import os
+
 PWD_HASH_SALT = b'secret here'
 PWD_HASH_ITERATIONS = 100_000
+PWD_HASH_WORKERS = os.cpu_count() or 1
+PWD_HASH_QUEUE_LIMIT = 4 * PWD_HASH_WORKERS
 JWT_SECRET = 's3cRSeT'
 JWT_ALGORITHM = 'HS256'
+JWT_CACHE_MAXSIZE = 10_000
+JWT_CACHE_TTL = 60
+PAGE_DEFAULT_LIMIT = 50
+PAGE_MAX_LIMIT = 500
+SEARCH_MAX_TERMS = 10
+SUGGEST_MAX_WORDS = 4
+SUGGEST_MAX_KEY_LENGTH = 24
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+LEADERBOARD_SIZE = 100
+SIMILAR_WEIGHTS = {'genre': 3.0, 'director': 2.0, 'year': 1.0, 'rating': 1.0}
+SIMILAR_YEAR_SCALE = 10
+SIMILAR_DEFAULT_LIMIT = 10
+SIMILAR_MAX_LIMIT = 50
+CACHE_SETTINGS = {
+    'director': {'maxsize': 1024, 'ttl': 300},
+    'genre': {'maxsize': 256, 'ttl': 300},
+    'movie': {'maxsize': 4096, 'ttl': 60},
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_SQLITE_PATH = os.environ.get(
+    'CACHE_SQLITE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache.db')
+)
+IMPORT_BATCH_SIZE = 5_000
+IMPORT_MAX_ERRORS = 100
+BATCH_MAX_ITEMS = 1_000
+STREAM_CHUNK_SIZE = 1_000
+STATS_MATERIALIZED = os.environ.get('STATS_MATERIALIZED', '1') == '1'
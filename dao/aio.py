@@ -0,0 +1,34 @@
+class AsyncDAO:
+    """
+    Класс описывает асинхронную обертку над синхронным DAO для асинхронного режима работы (см. asgi.py).
+    Любой метод DAO вызывается как корутина: await AsyncDAO(MovieDAO, sessions).get_one(1).
+    Метод выполняется в AsyncSession.run_sync с асинхронным драйвером базы данных (aiosqlite),
+    поэтому запросы DAO не дублируются, а ожидание ответа базы данных не занимает поток сервера.
+
+    Каждый вызов выполняется в отдельной сессии. Методы записи фиксируются одной транзакцией (commit),
+    но не очищают кеши и индексы в памяти синхронного приложения (CachedDAO), поэтому асинхронный режим
+    используется только для чтения, а запись выполняется синхронными сервисами.
+    """
+
+    def __init__(self, dao_class: type, sessions):
+        """
+        Метод инициализирует обертку.
+        :param dao_class: Класс DAO, унаследованный от BaseDAO.
+        :param sessions: Фабрика асинхронных сессий (sessionmaker с class_=AsyncSession).
+        """
+        self.dao_class = dao_class
+        self.sessions = sessions
+
+    def __getattr__(self, name: str):
+        method = getattr(self.dao_class, name)
+
+        def run(sync_session, *args, **kwargs):
+            return method(self.dao_class(sync_session), *args, **kwargs)
+
+        async def call(*args, **kwargs):
+            async with self.sessions() as session:
+                result = await session.run_sync(run, *args, **kwargs)
+                await session.commit()
+            return result
+
+        return call
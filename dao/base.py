@@ -0,0 +1,121 @@
+from typing import Optional
+
+from setup_db import use_primary
+
+
+class BaseDAO:
+    """
+    Базовый класс Data Access Object (DAO) с общими для всех таблиц методами.
+    В наследниках необходимо указать модель в поле класса model.
+    Методы записи не фиксируют транзакцию (только flush): ее фиксирует один раз единица работы
+    сервиса (см. service.unit_of_work).
+    """
+    model = None
+
+    def __init__(self, session):
+        """
+        Метод инициализирует поле класса session, как сессию работы с базой данных.
+        :param session: Сессия базы данных
+        """
+        self.session = session
+
+    def get_page(self, after: Optional[list], limit: int) -> list:
+        """
+        Метод реализует постраничное (keyset) получение записей из базы данных.
+        Страница выбирается диапазонным запросом по первичному ключу, поэтому время ответа
+        не зависит от того, насколько глубоко клиент пролистал таблицу.
+        :param after: Ключ последней записи предыдущей страницы, завершающийся ее id (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :return: Ответ базы данных на запрос получения страницы записей.
+        """
+        query = self.session.query(self.model)
+        if after is not None:
+            query = query.filter(self.model.id > after[-1])
+        return query.order_by(self.model.id).limit(limit).all()
+
+    def get_columns(self, fields: tuple, after: Optional[list] = None, limit: Optional[int] = None) -> list:
+        """
+        Метод реализует получение записей только с выбранными полями (SELECT только нужных колонок).
+        Поле id выбирается всегда, оно нужно для постраничного вывода.
+        :param fields: Названия выбираемых полей.
+        :param after: Ключ последней записи предыдущей страницы, завершающийся ее id (None - с начала таблицы).
+        :param limit: Максимальное количество записей (None - без ограничения).
+        :return: Строки результата запроса.
+        """
+        columns = [getattr(self.model, field) for field in dict.fromkeys(('id',) + tuple(fields))]
+        query = self.session.query(*columns)
+        if after is not None:
+            query = query.filter(self.model.id > after[-1])
+        query = query.order_by(self.model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def bulk_create(self, rows: list[dict]) -> int:
+        """
+        Метод реализует запись пачки новых записей в базу данных одним запросом INSERT
+        с множеством наборов параметров (executemany) в одной транзакции.
+        Отсутствующие в записи поля заполняются значением NULL.
+        :param rows: Данные, которые необходимо записать в базу данных.
+        :return: Количество записанных записей.
+        """
+        columns = self.model.__table__.columns.keys()
+        values = [{column: row.get(column) for column in columns} for row in rows]
+        self.session.execute(self.model.__table__.insert(), values)
+        return len(rows)
+
+    def patch(self, pk, data: dict) -> bool:
+        """
+        Метод реализует частичное изменение записи одним запросом UPDATE ... WHERE id = ?
+        только с переданными полями, без предварительного чтения записи.
+        :param pk: id записи в базе данных.
+        :param data: Новые значения изменяемых полей.
+        :return: True, если запись есть в базе данных, иначе False.
+        """
+        if not data:
+            return bool(self.existing_ids([pk]))
+        table = self.model.__table__
+        result = self.session.execute(table.update().where(table.c.id == pk).values(data))
+        return result.rowcount > 0
+
+    def existing_ids(self, ids: list) -> set:
+        """
+        Метод реализует проверку существования записей одним запросом к основной базе данных.
+        :param ids: Список id записей.
+        :return: Множество id, которые есть в базе данных.
+        """
+        with use_primary(self.session):
+            rows = self.session.query(self.model.id).filter(self.model.id.in_(ids)).all()
+        return {row.id for row in rows}
+
+    def bulk_update(self, changes: list[dict]) -> set:
+        """
+        Метод реализует изменение пачки записей в одной транзакции.
+        Записи с одинаковыми новыми значениями полей изменяются одним запросом UPDATE ... WHERE id IN (...),
+        поэтому массовая замена значения (например, жанра у тысяч фильмов) - один запрос к базе данных.
+        :param changes: Изменения: словари с id записи и новыми значениями полей.
+        :return: Множество id измененных записей (изменения несуществующих записей пропускаются).
+        """
+        found = self.existing_ids([change['id'] for change in changes])
+        groups = {}
+        for change in changes:
+            if change['id'] in found:
+                values = tuple(sorted((key, value) for key, value in change.items() if key != 'id'))
+                groups.setdefault(values, []).append(change['id'])
+        table = self.model.__table__
+        for values, ids in groups.items():
+            if values:
+                self.session.execute(table.update().where(table.c.id.in_(ids)).values(dict(values)))
+        return found
+
+    def bulk_delete(self, ids: list) -> set:
+        """
+        Метод реализует удаление пачки записей одним запросом DELETE ... WHERE id IN (...) в одной транзакции.
+        :param ids: Список id записей.
+        :return: Множество id удаленных записей.
+        """
+        found = self.existing_ids(ids)
+        if found:
+            table = self.model.__table__
+            self.session.execute(table.delete().where(table.c.id.in_(found)))
+        return found
@@ -0,0 +1,482 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from constants import CACHE_BACKEND, CACHE_SQLITE_PATH
+from setup_db import after_commit, use_primary
+
+MISSING = object()
+
+
+class CacheBackend:
+    """
+    Базовый класс кеша с ограничением количества записей и временем жизни записей (TTL).
+    Ведет счетчики попаданий и промахов. Наследники реализуют хранение записей.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Метод инициализирует параметры и счетчики кеша.
+        :param maxsize: Максимальное количество записей.
+        :param ttl: Время жизни записи по умолчанию в секундах.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get_version(self) -> tuple:
+        """
+        Метод возвращает версию данных, которые кешируются, и время их последнего изменения.
+        Эпоха меняется при пересоздании хранилища версий, поэтому пара (эпоха, номер)
+        никогда не повторяется для разных состояний данных.
+        :return: Кортеж (эпоха, номер версии, время изменения в секундах от начала эпохи Unix).
+        """
+        raise NotImplementedError
+
+    def bump_version(self) -> tuple:
+        """
+        Метод увеличивает номер версии данных после их изменения.
+        :return: Новая версия в формате метода get_version.
+        """
+        raise NotImplementedError
+
+    def get(self, key: str):
+        """
+        Метод возвращает значение из кеша.
+        :param key: Ключ записи.
+        :return: Значение или MISSING, если записи нет или ее время жизни истекло.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """
+        Метод записывает значение в кеш.
+        :param key: Ключ записи.
+        :param value: Значение.
+        :param ttl: Время жизни записи в секундах (None - время жизни по умолчанию).
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """
+        Метод удаляет запись из кеша.
+        :param key: Ключ записи.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """
+        Метод удаляет все записи из кеша.
+        """
+        raise NotImplementedError
+
+    def size(self) -> int:
+        """
+        Метод возвращает количество записей в кеше.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Метод возвращает статистику использования кеша.
+        :return: Словарь с количеством попаданий, промахов и записей.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': self.size(), 'maxsize': self.maxsize}
+
+
+class MemoryCache(CacheBackend):
+    """
+    Класс описывает кеш в памяти процесса. При превышении максимального количества записей
+    вытесняются давно не использованные (LRU).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Метод инициализирует хранилище и счетчики кеша.
+        :param maxsize: Максимальное количество записей, при превышении вытесняются давно не использованные.
+        :param ttl: Время жизни записи по умолчанию в секундах.
+        """
+        super().__init__(maxsize, ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = (uuid.uuid4().hex[:8], 0, time.time())
+
+    def get_version(self) -> tuple:
+        return self._version
+
+    def bump_version(self) -> tuple:
+        with self._lock:
+            epoch, number, _ = self._version
+            self._version = (epoch, number + 1, time.time())
+            return self._version
+
+    def get(self, key: str):
+        """
+        Метод возвращает значение из кеша.
+        :param key: Ключ записи.
+        :return: Значение или MISSING, если записи нет или ее время жизни истекло.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """
+        Метод записывает значение в кеш.
+        :param key: Ключ записи.
+        :param value: Значение.
+        :param ttl: Время жизни записи в секундах (None - время жизни по умолчанию).
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """
+        Метод удаляет запись из кеша.
+        :param key: Ключ записи.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Метод удаляет все записи из кеша.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def size(self) -> int:
+        """
+        Метод возвращает количество записей в кеше.
+        """
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Класс описывает кеш, общий для всех процессов (воркеров) на одном сервере.
+    Записи хранятся в файле SQLite в режиме WAL, поэтому очистка кеша после записи в базу данных
+    в одном воркере сразу видна остальным. Значения сериализуются pickle.
+    При превышении максимального количества записей вытесняются записи, которые истекают раньше других.
+    """
+
+    def __init__(self, path: str, namespace: str, maxsize: int, ttl: float):
+        """
+        Метод инициализирует кеш и создает таблицу для записей, если ее нет.
+        :param path: Путь к файлу кеша.
+        :param namespace: Пространство имен, отделяющее записи разных кешей в одном файле.
+        :param maxsize: Максимальное количество записей в пространстве имен.
+        :param ttl: Время жизни записи по умолчанию в секундах.
+        """
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        self._connection().executescript(
+            'CREATE TABLE IF NOT EXISTS cache_entry ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL, '
+            'PRIMARY KEY (namespace, key));'
+            'CREATE INDEX IF NOT EXISTS ix_cache_entry_expires_at ON cache_entry (namespace, expires_at);'
+            'CREATE TABLE IF NOT EXISTS cache_version ('
+            'namespace TEXT PRIMARY KEY, epoch TEXT NOT NULL, number INTEGER NOT NULL, modified_at REAL NOT NULL);'
+        )
+        self._connection().execute(
+            'INSERT OR IGNORE INTO cache_version (namespace, epoch, number, modified_at) VALUES (?, ?, 0, ?)',
+            (namespace, uuid.uuid4().hex[:8], time.time())
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение создается для каждого потока и заново после fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def get_version(self) -> tuple:
+        return self._connection().execute(
+            'SELECT epoch, number, modified_at FROM cache_version WHERE namespace = ?', (self.namespace,)
+        ).fetchone()
+
+    def bump_version(self) -> tuple:
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'UPDATE cache_version SET number = number + 1, modified_at = ? WHERE namespace = ?',
+                (time.time(), self.namespace)
+            )
+            return self.get_version()
+
+    def get(self, key: str):
+        row = self._connection().execute(
+            'SELECT value FROM cache_entry WHERE namespace = ? AND key = ? AND expires_at >= ?',
+            (self.namespace, key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT OR REPLACE INTO cache_entry (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (self.namespace, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at)
+            )
+            connection.execute('DELETE FROM cache_entry WHERE namespace = ? AND expires_at < ?', (self.namespace, now))
+            connection.execute(
+                'DELETE FROM cache_entry WHERE namespace = ? AND key IN ('
+                'SELECT key FROM cache_entry WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.namespace, self.namespace, self.maxsize)
+            )
+
+    def delete(self, key: str) -> None:
+        self._connection().execute('DELETE FROM cache_entry WHERE namespace = ? AND key = ?', (self.namespace, key))
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM cache_entry WHERE namespace = ?', (self.namespace,))
+
+    def size(self) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM cache_entry WHERE namespace = ? AND expires_at >= ?', (self.namespace, time.time())
+        ).fetchone()[0]
+
+
+def create_cache(namespace: str, maxsize: int, ttl: float, backend: str = CACHE_BACKEND) -> CacheBackend:
+    """
+    Функция создает кеш выбранного типа.
+    :param namespace: Название кеша (используется общим кешем для разделения записей).
+    :param maxsize: Максимальное количество записей.
+    :param ttl: Время жизни записи по умолчанию в секундах.
+    :param backend: Тип кеша: memory - в памяти процесса, sqlite - общий для всех процессов.
+    :return: Кеш.
+    """
+    if backend == 'memory':
+        return MemoryCache(maxsize, ttl)
+    if backend == 'sqlite':
+        return SQLiteCache(CACHE_SQLITE_PATH, namespace, maxsize, ttl)
+    raise ValueError(f'Unknown cache backend: {backend}')
+
+
+class CachedDAO:
+    """
+    Класс описывает кеширующую обертку над DAO (read-through).
+    Методы get_one и get_all обращаются к базе данных только при промахе кеша,
+    методы записи (create, update, delete, patch и пакетные) очищают кеш и увеличивают версию данных таблицы
+    после фиксации транзакции единицы работы (см. service.unit_of_work), а не сразу после записи:
+    иначе другой запрос мог бы заполнить кеш еще не измененными данными.
+    Остальные методы DAO вызываются без кеширования.
+
+    В кеше хранятся значения колонок, а не объекты ORM: объекты привязаны к сессии запроса,
+    поэтому при каждом попадании создаются новые отсоединенные (detached) объекты.
+    Их можно передавать в методы update и delete так же, как загруженные из базы данных.
+
+    Подписчики (см. subscribe) получают уведомление о каждой записи, например, чтобы обновить свои индексы в памяти.
+
+    При промахе кеш заполняется из основной базы данных, а не из реплики: иначе устаревшие данные реплики
+    остались бы в кеше до истечения времени жизни записи.
+    """
+
+    def __init__(self, dao, cache: CacheBackend):
+        """
+        Метод инициализирует обертку.
+        :param dao: DAO объект, унаследованный от BaseDAO.
+        :param cache: Кеш для хранения записей.
+        """
+        self.dao = dao
+        self.cache = cache
+        self.listeners = []
+
+    def __getattr__(self, name: str):
+        return getattr(self.dao, name)
+
+    def version(self) -> tuple:
+        """
+        Метод возвращает версию данных таблицы, которая увеличивается при каждой записи через DAO.
+        :return: Кортеж (эпоха, номер версии, время изменения), см. CacheBackend.get_version.
+        """
+        return self.cache.get_version()
+
+    def subscribe(self, listener) -> None:
+        """
+        Метод регистрирует функцию, которая вызывается после каждой записи через DAO:
+        listener(old_id, entity, version), где old_id - id измененной или удаленной записи до записи,
+        entity - созданная или измененная запись, version - новая версия данных таблицы.
+        При создании old_id равен None, при удалении entity равен None,
+        при массовой записи оба равны None - подписчик должен перечитать данные.
+        :param listener: Функция-подписчик.
+        """
+        self.listeners.append(listener)
+
+    def invalidate(self, old_id=None, entity=None) -> tuple:
+        """
+        Метод очищает кеш, увеличивает версию данных таблицы и уведомляет подписчиков.
+        Вызывается после фиксации транзакции с записью в базу данных.
+        :param old_id: id измененной или удаленной записи до записи.
+        :param entity: Созданная или измененная запись.
+        :return: Новая версия данных таблицы.
+        """
+        self.cache.clear()
+        version = self.cache.bump_version()
+        for listener in self.listeners:
+            listener(old_id, entity, version)
+        return version
+
+    @staticmethod
+    def _identity(entity):
+        identity = inspect(entity).identity
+        return identity[0] if identity else None
+
+    def _snapshot(self, entity) -> dict:
+        return {attr.key: getattr(entity, attr.key) for attr in inspect(entity).mapper.column_attrs}
+
+    def _restore(self, values: dict):
+        entity = self.dao.model(**values)
+        make_transient_to_detached(entity)
+        return entity
+
+    def _invalidate_after_commit(self, old_id=None, entity=None) -> None:
+        after_commit(self.dao.session, lambda: self.invalidate(old_id, entity))
+
+    def get_one(self, pk, *args, **kwargs):
+        """
+        Метод реализует получение записи по id через кеш.
+        Вызовы с дополнительными параметрами (например, загрузкой связей) выполняются без кеша.
+        :param pk: id записи в базе данных.
+        :return: Запись или None, если ее нет в базе данных.
+        """
+        if any(args) or any(kwargs.values()):
+            return self.dao.get_one(pk, *args, **kwargs)
+
+        key = f'one:{pk}'
+        values = self.cache.get(key)
+        if values is not MISSING:
+            return self._restore(values)
+
+        with use_primary(self.dao.session):
+            entity = self.dao.get_one(pk)
+        if entity is not None:
+            self.cache.set(key, self._snapshot(entity))
+        return entity
+
+    def get_all(self) -> list:
+        """
+        Метод реализует получение всех записей таблицы через кеш.
+        :return: Список записей.
+        """
+        values = self.cache.get('all')
+        if values is not MISSING:
+            return [self._restore(item) for item in values]
+
+        with use_primary(self.dao.session):
+            entities = self.dao.get_all()
+        self.cache.set('all', [self._snapshot(entity) for entity in entities])
+        return entities
+
+    def create(self, *args, **kwargs):
+        """
+        Метод реализует запись новых данных в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        result = self.dao.create(*args, **kwargs)
+        self._invalidate_after_commit(entity=result)
+        return result
+
+    def update(self, entity, *args, **kwargs):
+        """
+        Метод реализует обновление записи в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        old_id = self._identity(entity)
+        result = self.dao.update(entity, *args, **kwargs)
+        self._invalidate_after_commit(old_id, entity)
+        return result
+
+    def delete(self, entity, *args, **kwargs):
+        """
+        Метод реализует удаление записи в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        old_id = self._identity(entity)
+        result = self.dao.delete(entity, *args, **kwargs)
+        self._invalidate_after_commit(old_id)
+        return result
+
+    def patch(self, pk, data: dict) -> bool:
+        """
+        Метод реализует частичное изменение записи в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        Подписчики получают запись из кеша с новыми значениями полей, поэтому запись не читается повторно:
+        из базы данных она читается, только если ее нет в кеше. Пустое изменение не очищает кеш и не меняет версию.
+        """
+        result = self.dao.patch(pk, data)
+        if not result or not data:
+            return result
+        entity = None
+        if self.listeners:
+            values = self.cache.get(f'one:{pk}')
+            if values is not MISSING:
+                entity = self._restore({**values, **data})
+            else:
+                with use_primary(self.dao.session):
+                    entity = self.dao.get_one(pk)
+        if entity is None:
+            self._invalidate_after_commit()
+        else:
+            self._invalidate_after_commit(pk, entity)
+        return result
+
+    def bulk_create(self, *args, **kwargs):
+        """
+        Метод реализует запись пачки новых записей в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        result = self.dao.bulk_create(*args, **kwargs)
+        self._invalidate_after_commit()
+        return result
+
+    def bulk_update(self, *args, **kwargs):
+        """
+        Метод реализует изменение пачки записей в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        result = self.dao.bulk_update(*args, **kwargs)
+        self._invalidate_after_commit()
+        return result
+
+    def bulk_delete(self, *args, **kwargs):
+        """
+        Метод реализует удаление пачки записей в базе данных,
+        после фиксации транзакции очищает кеш и увеличивает версию данных.
+        """
+        result = self.dao.bulk_delete(*args, **kwargs)
+        self._invalidate_after_commit()
+        return result
@@ -1,17 +1,12 @@
+from dao.base import BaseDAO
 from dao.model.director import Director
 
 
-class DirectorDAO:
+class DirectorDAO(BaseDAO):
     """
     Класс описывает Data Access Object (DAO) для работы с базой данный, с таблицей фильмов.
     """
-
-    def __init__(self, session):
-        """
-        Метод инициализирует поле класса session, как сессию работы с базой данных.
-        :param session: Сессия базы данных
-        """
-        self.session = session
+    model = Director
 
     def get_one(self, did: int) -> list[Director]:
         """
@@ -28,15 +23,17 @@ class DirectorDAO:
         """
         return self.session.query(Director).all()
 
-    def create(self, data: dict) -> None:
+    def create(self, data: dict) -> list[Director]:
         """
         Метод реализует запись новых данных в базу данных.
         :param data: Данные, которые необходимо записать в базу данных.
+        :return: Созданная запись.
         """
         new_director = Director(**data)
 
         self.session.add(new_director)
-        self.session.commit()
+        self.session.flush()
+        return new_director
 
     def update(self, director: list[Director]) -> None:
         """
@@ -44,7 +41,7 @@ class DirectorDAO:
         :param director: Данные о фильме, которые нужно записать в базу данных.
         """
         self.session.add(director)
-        self.session.commit()
+        self.session.flush()
 
     def delete(self, director: list[Director]) -> None:
         """
@@ -53,4 +50,4 @@ class DirectorDAO:
         :return: None
         """
         self.session.delete(director)
-        self.session.commit()
+        self.session.flush()
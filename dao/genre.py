@@ -1,17 +1,12 @@
+from dao.base import BaseDAO
 from dao.model.genre import Genre
 
 
-class GenreDAO:
+class GenreDAO(BaseDAO):
     """
     Класс описывает Data Access Object (DAO) для работы с базой данный, с таблицей фильмов.
     """
-
-    def __init__(self, session):
-        """
-        Метод инициализирует поле класса session, как сессию работы с базой данных.
-        :param session: Сессия базы данных
-        """
-        self.session = session
+    model = Genre
 
     def get_one(self, gid: int) -> list[Genre]:
         """
@@ -28,15 +23,17 @@ class GenreDAO:
         """
         return self.session.query(Genre).all()
 
-    def create(self, data: dict) -> None:
+    def create(self, data: dict) -> list[Genre]:
         """
         Метод реализует запись новых данных в базу данных.
         :param data: Данные, которые необходимо записать в базу данных.
+        :return: Созданная запись.
         """
         new_genre = Genre(**data)
 
         self.session.add(new_genre)
-        self.session.commit()
+        self.session.flush()
+        return new_genre
 
     def update(self, genre: list[Genre]) -> None:
         """
@@ -44,7 +41,7 @@ class GenreDAO:
         :param genre: Данные о фильме, которые нужно записать в базу данных.
         """
         self.session.add(genre)
-        self.session.commit()
+        self.session.flush()
 
     def delete(self, genre: list[Genre]) -> None:
         """
@@ -53,4 +50,4 @@ class GenreDAO:
         :return: None
         """
         self.session.delete(genre)
-        self.session.commit()
+        self.session.flush()
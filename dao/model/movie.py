@@ -1,5 +1,7 @@
 from marshmallow import Schema, fields
 
+from dao.model.director import DirectorSchema
+from dao.model.genre import GenreSchema
 from setup_db import db
 
 
@@ -9,12 +11,13 @@ class Movie(db.Model):
     title = db.Column(db.String(255))
     description = db.Column(db.String(255))
     trailer = db.Column(db.String(255))
-    year = db.Column(db.Integer)
-    rating = db.Column(db.Float)
-    genre_id = db.Column(db.Integer, db.ForeignKey("genre.id"))
+    year = db.Column(db.Integer, index=True)
+    rating = db.Column(db.Float, index=True)
+    genre_id = db.Column(db.Integer, db.ForeignKey("genre.id"), index=True)
     genre = db.relationship("Genre")
-    director_id = db.Column(db.Integer, db.ForeignKey("director.id"))
+    director_id = db.Column(db.Integer, db.ForeignKey("director.id"), index=True)
     director = db.relationship("Director")
+    __table_args__ = (db.Index('ix_movie_genre_id_rating', 'genre_id', 'rating'),)
 
 
 class MovieSchema(Schema):
@@ -23,4 +26,8 @@ class MovieSchema(Schema):
     description = fields.Str()
     trailer = fields.Str()
     year = fields.Int()
-    rating = fields.Float()
\ No newline at end of file
+    rating = fields.Float()
+    genre_id = fields.Int(load_only=True)
+    director_id = fields.Int(load_only=True)
+    genre = fields.Nested(GenreSchema)
+    director = fields.Nested(DirectorSchema)
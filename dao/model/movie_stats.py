@@ -0,0 +1,26 @@
+from itertools import combinations
+
+from setup_db import db
+
+STATS_FIELDS = ('genre_id', 'director_id', 'year')
+# Все наборы полей группировки в порядке STATS_FIELDS, включая пустой
+STATS_GROUPINGS = [fields for size in range(len(STATS_FIELDS) + 1) for fields in combinations(STATS_FIELDS, size)]
+
+
+class MovieStats(db.Model):
+    """
+    Сводная таблица статистики фильмов. Для каждого набора полей группировки (group_fields - названия полей
+    из STATS_FIELDS через запятую, пустая строка - итог по всем фильмам) хранится по одной строке на группу,
+    поля, не входящие в набор, равны NULL.
+    Заполняется и обновляется триггерами на таблице movie (см. migrations.create_movie_stats).
+    """
+    __tablename__ = 'movie_stats'
+    id = db.Column(db.Integer, primary_key=True)
+    group_fields = db.Column(db.String(64), nullable=False)
+    genre_id = db.Column(db.Integer)
+    director_id = db.Column(db.Integer)
+    year = db.Column(db.Integer)
+    movie_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Float, nullable=False, default=0)
+    __table_args__ = (db.Index('ix_movie_stats_group', 'group_fields', 'genre_id', 'director_id', 'year'),)
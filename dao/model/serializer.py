@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+from marshmallow import Schema, fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.utils import ensure_text_type
+
+
+class FastSchema:
+    """
+    Класс описывает быстрый сериализатор, скомпилированный из сериализатора marshmallow.
+    Для каждого поля заранее выбирается преобразование значения (int, float, str, вложенный объект),
+    и из них генерируется одна функция, которая строит словарь за один вызов.
+    Результат совпадает с результатом метода dump сериализатора marshmallow.
+
+    Сериализуются объекты с доступом к полям через атрибуты (модели ORM, строки результата запроса).
+    Поля неизвестных типов сериализуются самими полями marshmallow, сериализаторы
+    с обработчиками pre_dump и post_dump не компилируются и вызываются как есть.
+    """
+
+    def __init__(self, schema: Schema):
+        """
+        Метод компилирует функцию сериализации одного объекта.
+        :param schema: Сериализатор marshmallow.
+        """
+        self.schema = schema
+        self.many = schema.many
+        if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+            self._dump_one = lambda obj: schema.dump(obj, many=False)
+        else:
+            self._dump_one = self._compile(schema)
+
+    def dump(self, obj, many: bool = None):
+        """
+        Метод сериализует объект или список объектов.
+        :param obj: Объект или список объектов.
+        :param many: Сериализация списка (по умолчанию - как в исходном сериализаторе).
+        :return: Словарь или список словарей.
+        """
+        many = self.many if many is None else many
+        if many:
+            dump_one = self._dump_one
+            return [dump_one(item) for item in obj]
+        return self._dump_one(obj)
+
+    @staticmethod
+    def _compile(schema: Schema):
+        namespace = {'ensure_text_type': ensure_text_type}
+        lines = ['def dump(obj):']
+        items = []
+        for i, (name, field) in enumerate(schema.dump_fields.items()):
+            value = f'v{i}'
+            lines.append(f'    {value} = getattr(obj, {field.attribute or name!r})')
+            if type(field) is fields.Integer and not field.as_string:
+                expression = f'None if {value} is None else int({value})'
+            elif type(field) is fields.Float and not field.as_string:
+                expression = f'None if {value} is None else float({value})'
+            elif type(field) is fields.String:
+                expression = f'{value} if {value} is None or {value}.__class__ is str else ensure_text_type({value})'
+            elif type(field) is fields.Nested:
+                namespace[f'nested{i}'] = FastSchema(field.schema).dump
+                many = field.schema.many or field.many
+                expression = f'None if {value} is None else nested{i}({value}, many={many})'
+            else:
+                namespace[f'field{i}'] = field
+                expression = f'field{i}._serialize({value}, {name!r}, obj)'
+            key = field.data_key if field.data_key is not None else name
+            items.append(f'{key!r}: {expression}')
+        lines.append('    return {' + ', '.join(items) + '}')
+        exec('\n'.join(lines), namespace)
+        return namespace['dump']
+
+
+def compile_schema(schema: Schema) -> FastSchema:
+    """
+    Функция компилирует сериализатор marshmallow в быстрый сериализатор (см. FastSchema).
+    :param schema: Сериализатор marshmallow.
+    :return: Быстрый сериализатор с тем же методом dump.
+    """
+    return FastSchema(schema)
+
+
+@lru_cache
+def compile_partial_schema(schema_class: type, only: tuple, many: bool = False) -> FastSchema:
+    """
+    Функция компилирует сериализатор, ограниченный выбранными полями. Результат кешируется.
+    :param schema_class: Класс сериализатора marshmallow.
+    :param only: Названия сериализуемых полей.
+    :param many: Сериализация списка объектов.
+    :return: Быстрый сериализатор.
+    """
+    return FastSchema(schema_class(only=only, many=many))
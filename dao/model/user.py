@@ -6,7 +6,7 @@ from setup_db import db
 class User(db.Model):
     __tablename__ = 'user'
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String)
+    username = db.Column(db.String, index=True)
     password = db.Column(db.String)
     role = db.Column(db.String)
 
@@ -1,35 +1,229 @@
+import re
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, column, func, literal_column, or_, table
+from sqlalchemy.orm import joinedload
+
+from dao.base import BaseDAO
 from dao.model.movie import Movie
+from dao.model.movie_stats import MovieStats, STATS_FIELDS
 
+# Полнотекстовый индекс фильмов (см. migrations.create_movie_search), в модели не объявляется
+movie_fts = table('movie_fts', column('rowid'), column('movie_fts'))
 
-class MovieDAO:
+
+class MovieQuery:
     """
-    Класс описывает Data Access Object (DAO) для работы с базой данный, с таблицей фильмов.
+    Класс описывает построитель запроса к таблице фильмов.
+    Условия фильтрации (равенство, вхождение в список, диапазон) и порядок сортировки накапливаются
+    и компилируются в один SQL-запрос. Записи с одинаковыми значениями полей сортировки
+    дополнительно упорядочиваются по id, поэтому ключ (поля сортировки + id) однозначно
+    определяет позицию записи и используется для постраничного (keyset) вывода.
     """
+    fields = ('id', 'title', 'year', 'rating', 'genre_id', 'director_id')
+    relations = ('director', 'genre')
+    selectable = ('id', 'title', 'description', 'trailer', 'year', 'rating')
+
+    def __init__(self):
+        """
+        Метод инициализирует пустые списки условий фильтрации, полей сортировки, загружаемых связей
+        и выбираемых полей.
+        """
+        self.conditions = []
+        self.order = []
+        self.expanded = []
+        self.selected = []
+
+    def column(self, field: str):
+        """
+        Метод возвращает колонку таблицы фильмов по названию поля.
+        :param field: Название поля.
+        :return: Колонка модели Movie.
+        :raises ValueError: Если поле не поддерживается.
+        """
+        if field not in self.fields:
+            raise ValueError(f'Unknown movie field: {field}')
+        return getattr(Movie, field)
+
+    def equal(self, field: str, value) -> 'MovieQuery':
+        """
+        Метод добавляет условие равенства значения поля.
+        :param field: Название поля.
+        :param value: Значение поля.
+        :return: Построитель запроса.
+        """
+        self.conditions.append(self.column(field) == value)
+        return self
+
+    def any_of(self, field: str, values: list) -> 'MovieQuery':
+        """
+        Метод добавляет условие вхождения значения поля в список (IN).
+        :param field: Название поля.
+        :param values: Список допустимых значений.
+        :return: Построитель запроса.
+        """
+        if len(values) == 1:
+            return self.equal(field, values[0])
+        self.conditions.append(self.column(field).in_(values))
+        return self
+
+    def between(self, field: str, low=None, high=None) -> 'MovieQuery':
+        """
+        Метод добавляет условие попадания значения поля в диапазон (границы включаются).
+        :param field: Название поля.
+        :param low: Нижняя граница диапазона (None - без ограничения).
+        :param high: Верхняя граница диапазона (None - без ограничения).
+        :return: Построитель запроса.
+        """
+        column = self.column(field)
+        if low is not None:
+            self.conditions.append(column >= low)
+        if high is not None:
+            self.conditions.append(column <= high)
+        return self
+
+    def sort(self, field: str, descending: bool = False) -> 'MovieQuery':
+        """
+        Метод добавляет поле в порядок сортировки.
+        :param field: Название поля.
+        :param descending: Сортировка по убыванию.
+        :return: Построитель запроса.
+        """
+        self.column(field)
+        self.order.append((field, descending))
+        return self
+
+    def expand(self, *relations: str) -> 'MovieQuery':
+        """
+        Метод добавляет связанные записи (режиссера, жанр), которые загружаются тем же запросом (JOIN).
+        :param relations: Названия связей модели Movie.
+        :return: Построитель запроса.
+        :raises ValueError: Если связь не поддерживается.
+        """
+        for relation in relations:
+            if relation not in self.relations:
+                raise ValueError(f'Unknown movie relation: {relation}')
+            self.expanded.append(relation)
+        if self.selected and self.expanded:
+            raise ValueError('Column selection cannot be combined with expand')
+        return self
+
+    def select(self, *fields: str) -> 'MovieQuery':
+        """
+        Метод ограничивает запрос выбранными полями (SELECT только нужных колонок).
+        Результатом запроса становятся строки с этими полями и полями сортировки, а не объекты модели Movie.
+        Не совместим с загрузкой связей (метод expand).
+        :param fields: Названия полей.
+        :return: Построитель запроса.
+        :raises ValueError: Если поле не поддерживается или запрошена загрузка связей.
+        """
+        for field in fields:
+            if field not in self.selectable:
+                raise ValueError(f'Unknown movie column: {field}')
+            self.selected.append(field)
+        if self.selected and self.expanded:
+            raise ValueError('Column selection cannot be combined with expand')
+        return self
+
+    def sort_keys(self) -> list:
+        """
+        Метод возвращает полный порядок сортировки, завершающийся полем id.
+        Поле id сортируется в том же направлении, что и последнее поле сортировки: индекс SQLite хранит
+        записи с равным значением поля в порядке id, поэтому запрос с LIMIT читает индекс подряд без сортировки.
+        :return: Список пар (название поля, сортировка по убыванию).
+        """
+        if any(field == 'id' for field, _ in self.order):
+            return list(self.order)
+        descending = self.order[-1][1] if self.order else False
+        return self.order + [('id', descending)]
 
-    def __init__(self, session):
+    def key(self, movie) -> list:
         """
-        Метод инициализирует поле класса session, как сессию работы с базой данных.
-        :param session: Сессия базы данных
+        Метод возвращает ключ записи в порядке сортировки запроса.
+        :param movie: Запись о фильме.
+        :return: Список значений полей сортировки.
         """
-        self.session = session
+        return [getattr(movie, field) for field, _ in self.sort_keys()]
 
-    def create(self, data: dict) -> None:
+    def after(self, key: list) -> 'MovieQuery':
+        """
+        Метод добавляет условие выборки записей, следующих после записи с ключом key.
+        Учитывается порядок NULL в SQLite: при сортировке по возрастанию NULL идут первыми,
+        по убыванию - последними.
+        :param key: Ключ последней записи предыдущей страницы (см. метод key).
+        :return: Построитель запроса.
+        :raises ValueError: Если ключ не соответствует порядку сортировки.
+        """
+        sort_keys = self.sort_keys()
+        if len(key) != len(sort_keys):
+            raise ValueError('Cursor does not match sort order')
+
+        branches = []
+        for i, (field, descending) in enumerate(sort_keys):
+            beyond = self._beyond(self.column(field), key[i], descending)
+            if beyond is None:
+                continue
+            same_prefix = [self._same(self.column(f), key[j]) for j, (f, _) in enumerate(sort_keys[:i])]
+            branches.append(and_(*same_prefix, beyond))
+        self.conditions.append(or_(*branches))
+        return self
+
+    @staticmethod
+    def _same(column, value):
+        return column.is_(None) if value is None else column == value
+
+    @staticmethod
+    def _beyond(column, value, descending: bool):
+        if descending:
+            return None if value is None else or_(column < value, column.is_(None))
+        return column.isnot(None) if value is None else column > value
+
+    def apply(self, query):
+        """
+        Метод применяет накопленные условия, порядок сортировки, загрузку связей и выбор полей к запросу SQLAlchemy.
+        :param query: Запрос к таблице фильмов.
+        :return: Запрос с условиями фильтрации и сортировкой.
+        """
+        order_by = [self.column(field).desc() if descending else self.column(field).asc()
+                    for field, descending in self.sort_keys()]
+        if self.selected:
+            fields = dict.fromkeys(self.selected + [field for field, _ in self.sort_keys()])
+            query = query.with_entities(*[getattr(Movie, field) for field in fields])
+        options = [joinedload(getattr(Movie, relation)) for relation in self.expanded]
+        return query.options(*options).filter(*self.conditions).order_by(*order_by)
+
+
+class MovieDAO(BaseDAO):
+    """
+    Класс описывает Data Access Object (DAO) для работы с базой данный, с таблицей фильмов.
+    """
+    model = Movie
+
+    def create(self, data: dict) -> list[Movie]:
         """
         Метод реализует запись новых данных в базу данных.
         :param data: Данные, которые необходимо записать в базу данных.
+        :return: Созданная запись.
         """
         new_movie = Movie(**data)
 
         self.session.add(new_movie)
-        self.session.commit()
+        self.session.flush()
+        return new_movie
 
-    def get_one(self, mid: int) -> list[Movie]:
+    def get_one(self, mid: int, expand: tuple = (), fields: tuple = ()) -> list[Movie]:
         """
         Метод реализует получение записи об одном фильме из базы данных по id.
         :param mid: id фильма в базе данных.
+        :param expand: Названия связей (director, genre), загружаемых тем же запросом.
+        :param fields: Названия выбираемых полей (по умолчанию - объект модели Movie целиком).
         :return: Ответ базы данных на запрос о получении записи о фильме по id.
         """
-        return self.session.query(Movie).filter(Movie.id == mid).one_or_none()
+        if fields:
+            columns = [getattr(Movie, field) for field in fields]
+            return self.session.query(*columns).filter(Movie.id == mid).one_or_none()
+        options = [joinedload(getattr(Movie, relation)) for relation in expand]
+        return self.session.query(Movie).options(*options).filter(Movie.id == mid).one_or_none()
 
     def get_all(self) -> list[Movie]:
         """
@@ -38,29 +232,124 @@ class MovieDAO:
         """
         return self.session.query(Movie).all()
 
-    def get_all_on_director(self, director_id: int) -> list[Movie]:
+    def get_filtered(self, movie_query: MovieQuery, limit: Optional[int] = None) -> list[Movie]:
+        """
+        Метод реализует получение записей о фильмах, удовлетворяющих условиям построителя запроса.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :param limit: Максимальное количество записей (None - без ограничения).
+        :return: Ответ базы данных на запрос.
+        """
+        query = movie_query.apply(self.session.query(Movie))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def iter_filtered(self, movie_query: MovieQuery, chunk_size: int) -> Iterator[Movie]:
         """
-        Метод реализует получение записей о всех фильмах по конкретному режиссеру.
-        :param director_id: id режиссера в базе данных.
-        :return: Ответ базы данных на запрос к базе данных.
+        Метод реализует потоковое получение записей о фильмах, удовлетворяющих условиям построителя запроса.
+        Записи загружаются из базы данных частями (yield_per), поэтому потребление памяти
+        не зависит от размера таблицы.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :param chunk_size: Количество записей, загружаемых из базы данных за один раз.
+        :return: Итератор записей.
         """
-        return self.session.query(Movie).filter(Movie.director_id == director_id)
+        return iter(movie_query.apply(self.session.query(Movie)).yield_per(chunk_size))
 
-    def get_all_on_genre(self, genre_id: int) -> list[Movie]:
+    def get_page(self, after: Optional[list], limit: int, movie_query: Optional[MovieQuery] = None) -> list[Movie]:
         """
-        Метод реализует получение записей о всех фильмах по конкретному жанру.
-        :param genre_id: id жанра к базе данных.
-        :return: Ответ базы данных на запрос.
+        Метод реализует постраничное (keyset) получение записей о фильмах с учетом фильтрации и сортировки.
+        :param after: Ключ последней записи предыдущей страницы (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :return: Ответ базы данных на запрос получения страницы записей.
         """
-        return self.session.query(Movie).filter(Movie.genre_id == genre_id)
+        movie_query = movie_query or MovieQuery()
+        if after is not None:
+            movie_query.after(after)
+        return self.get_filtered(movie_query, limit)
 
-    def get_all_by_year(self, year: int) -> list[Movie]:
+    def get_stats(self, group_by: tuple, materialized: bool = False) -> list:
         """
-        Метод реализует получение записей о всех фильмах по конкретному году выпуска.
-        :param year: Год выпуска фильма.
-        :return: Ответ базы данных на запрос.
+        Метод реализует получение статистики фильмов (количество и средний рейтинг) с группировкой (GROUP BY).
+        При materialized=True готовые строки групп читаются из сводной таблицы movie_stats
+        без просмотра таблицы movie.
+        :param group_by: Поля группировки: genre_id, director_id, year (пустой кортеж - итог по всем фильмам).
+        :param materialized: Использовать сводную таблицу movie_stats.
+        :return: Строки с полями группировки, количеством фильмов (count) и средним рейтингом (avg_rating).
+        :raises ValueError: Если поле группировки не поддерживается.
+        """
+        for field in group_by:
+            if field not in STATS_FIELDS:
+                raise ValueError(f'Unknown stats field: {field}')
+        if materialized:
+            columns = [getattr(MovieStats, field) for field in group_by]
+            group_fields = ','.join(field for field in STATS_FIELDS if field in group_by)
+            avg_rating = MovieStats.rating_sum / func.nullif(MovieStats.rating_count, 0)
+            query = (self.session.query(*columns, MovieStats.movie_count.label('count'),
+                                        func.round(avg_rating, 2).label('avg_rating'))
+                     .filter(MovieStats.group_fields == group_fields))
+            return query.order_by(*columns).all()
+
+        columns = [getattr(Movie, field) for field in group_by]
+        query = self.session.query(*columns, func.count(Movie.id).label('count'),
+                                   func.round(func.avg(Movie.rating), 2).label('avg_rating'))
+        return query.group_by(*columns).order_by(*columns).all()
+
+    def get_top(self, genre_id: Optional[int], limit: int, fields: tuple = MovieQuery.selectable) -> list:
+        """
+        Метод реализует получение фильмов с наибольшим рейтингом (фильмы без рейтинга не учитываются).
+        Запрос читает индекс ix_movie_genre_id_rating (или ix_movie_rating для всех жанров) в обратном порядке
+        и останавливается после limit записей, без сортировки всей таблицы.
+        :param genre_id: id жанра (None - все жанры).
+        :param limit: Максимальное количество записей.
+        :param fields: Названия выбираемых полей.
+        :return: Строки с полями фильма, упорядоченные по убыванию рейтинга, при равном рейтинге - по убыванию id.
+        """
+        query = self.session.query(*[getattr(Movie, field) for field in fields]).filter(Movie.rating.isnot(None))
+        if genre_id is not None:
+            query = query.filter(Movie.genre_id == genre_id)
+        return query.order_by(Movie.rating.desc(), Movie.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def match_expression(text: str, max_terms: int) -> Optional[str]:
+        """
+        Метод преобразует поисковую строку пользователя в безопасное выражение FTS5 MATCH.
+        Из строки берутся только слова (операторы и спецсимволы FTS5 отбрасываются), каждое слово
+        ищется как отдельный термин, все слова должны встречаться в фильме, последнее слово ищется по префиксу.
+        :param text: Поисковая строка.
+        :param max_terms: Максимальное количество слов.
+        :return: Выражение MATCH или None, если в строке нет слов.
+        """
+        terms = re.findall(r'\w+', text)[:max_terms]
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"' for term in terms) + '*'
+
+    def search(self, match: str, after: Optional[list] = None, limit: Optional[int] = None,
+               fields: tuple = ()) -> list:
+        """
+        Метод реализует полнотекстовый поиск фильмов по названию и описанию (индекс FTS5 movie_fts).
+        Результаты упорядочены по релевантности bm25 (совпадения в названии весят в 10 раз больше),
+        при равной релевантности - по id.
+        :param match: Выражение FTS5 MATCH (см. match_expression).
+        :param after: Ключ последней записи предыдущей страницы [релевантность, id] (None - первая страница).
+        :param limit: Максимальное количество записей (None - без ограничения).
+        :param fields: Названия выбираемых полей (по умолчанию - все поля фильма без связей).
+        :return: Строки с полями фильма и релевантностью (поле score, чем меньше - тем выше).
         """
-        return self.session.query(Movie).filter(Movie.year == year)
+        score = literal_column('bm25(movie_fts, 10.0, 1.0)')
+        names = dict.fromkeys(('id',) + (tuple(fields) or MovieQuery.selectable))
+        query = (self.session.query(*[getattr(Movie, name) for name in names], score.label('score'))
+                 .join(movie_fts, movie_fts.c.rowid == Movie.id)
+                 .filter(movie_fts.c.movie_fts.op('MATCH')(match)))
+        if after is not None:
+            if len(after) != 2:
+                raise ValueError('Cursor does not match sort order')
+            query = query.filter(or_(score > after[0], and_(score == after[0], Movie.id > after[1])))
+        query = query.order_by(score, Movie.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
     def update(self, movie: list[Movie]) -> None:
         """
@@ -68,7 +357,7 @@ class MovieDAO:
         :param movie: Данные о фильме, которые нужно записать в базу данных.
         """
         self.session.add(movie)
-        self.session.commit()
+        self.session.flush()
 
     def delete(self, movie: list[Movie]) -> None:
         """
@@ -77,4 +366,4 @@ class MovieDAO:
         :return: None
         """
         self.session.delete(movie)
-        self.session.commit()
+        self.session.flush()
@@ -1,17 +1,12 @@
+from dao.base import BaseDAO
 from dao.model.user import User
 
 
-class UserDAO:
+class UserDAO(BaseDAO):
     """
     Класс описывает Data Access Object (DAO) для работы с базой данный, с таблицей фильмов.
     """
-
-    def __init__(self, session):
-        """
-        Метод инициализирует поле класса session, как сессию работы с базой данных.
-        :param session: Сессия базы данных
-        """
-        self.session = session
+    model = User
 
     def get_all(self) -> list[User]:
         """
@@ -43,7 +38,7 @@ class UserDAO:
         """
         new_user = User(**data)
         self.session.add(new_user)
-        self.session.commit()
+        self.session.flush()
         return new_user
 
     def delete(self, user: list[User]) -> None:
@@ -52,7 +47,7 @@ class UserDAO:
         :param user: Данные о пользователе, которые нужно записать в базу данных.
         """
         self.session.delete(user)
-        self.session.commit()
+        self.session.flush()
 
     def update(self, user: list[User]) -> None:
         """
@@ -61,4 +56,4 @@ class UserDAO:
         :return: None
         """
         self.session.add(user)
-        self.session.commit()
+        self.session.flush()
@@ -1,6 +1,41 @@
+import base64
+import hashlib
+import json
+import math
+import time
+from typing import Optional
+
 import jwt
 from flask import request, abort
-from constants import JWT_SECRET, JWT_ALGORITHM
+from werkzeug.http import http_date
+from werkzeug.wrappers import Response
+from constants import JWT_SECRET, JWT_ALGORITHM, JWT_CACHE_MAXSIZE, JWT_CACHE_TTL, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
+from dao.cache import MemoryCache, MISSING
+from replica import require_fresh_reads
+
+token_cache = MemoryCache(maxsize=JWT_CACHE_MAXSIZE, ttl=JWT_CACHE_TTL)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Функция проверяет подпись JWT и возвращает его данные.
+    Проверенные данные хранятся в кеше по хешу токена до истечения срока действия токена (exp),
+    поэтому повторные запросы с тем же токеном не проверяют подпись заново.
+    Токены без срока действия хранятся в кеше JWT_CACHE_TTL секунд.
+
+    :param token: JWT.
+    :return: Данные токена.
+    :raises jwt.PyJWTError: Если токен недействителен.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not MISSING:
+        return payload
+
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    ttl = payload['exp'] - time.time() if 'exp' in payload else None
+    token_cache.set(key, payload, ttl)
+    return payload
 
 
 def auth_required(func):
@@ -16,7 +51,7 @@ def auth_required(func):
         data = request.headers["Authorization"]
         token = data.split("Bearer ")[-1]
         try:
-            jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            decode_token(token)
         except Exception as e:
             print('JWT Decode Exception', e)
             abort(401)
@@ -38,7 +73,7 @@ def admin_required(func):
         data = request.headers["Authorization"]
         token = data.split("Bearer ")[-1]
         try:
-            user = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            user = decode_token(token)
             role = user.get('role')
             if role != 'admin':
                 abort(400)
@@ -48,3 +83,156 @@ def admin_required(func):
         return func(*args, **kwargs)
 
     return wrapper
+
+
+def version_headers(versions: list, full_path: str, accept: Optional[str]) -> tuple:
+    """
+    Функция вычисляет заголовки кеширования ответа по версиям данных таблиц.
+    ETag вычисляется из версий данных, адреса запроса и заголовка Accept.
+
+    :param versions: Версии данных таблиц (см. CachedDAO.version).
+    :param full_path: Адрес запроса с квери-параметрами (request.full_path).
+    :param accept: Значение заголовка Accept.
+    :return: Кортеж (ETag без кавычек, время последнего изменения, словарь заголовков ответа).
+    """
+    source = repr(([version[:2] for version in versions], full_path, accept))
+    etag = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    # Округление вверх: Last-Modified не раньше последнего изменения, даже если изменений несколько в одну секунду
+    last_modified = math.ceil(max(version[2] for version in versions))
+    headers = {'ETag': f'"{etag}"', 'Last-Modified': http_date(last_modified), 'Vary': 'Accept'}
+    return etag, last_modified, headers
+
+
+def conditional_get(*daos):
+    """
+    Функция-декоратор для условных GET-запросов (ETag, Last-Modified, HTTP-код 304).
+    ETag вычисляется из версий данных таблиц (см. CachedDAO.version и version_headers).
+    Если ETag клиента из заголовка If-None-Match совпадает с текущим, возвращается HTTP-код 304
+    без запроса к базе данных и сериализации. If-Modified-Since не учитывается: у ответа всегда есть ETag,
+    а точность даты - одна секунда, и после двух изменений в одну секунду клиент получил бы устаревшие данные.
+    Если данные изменились после последней синхронизации реплики, запрос читает из основной базы данных.
+
+    :param daos: Кеширующие DAO таблиц, данные которых используются в ответе.
+    """
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            versions = [dao.version() for dao in daos]
+            etag, _, headers = version_headers(versions, request.full_path, request.headers.get('Accept'))
+
+            if request.if_none_match and request.if_none_match.contains(etag):
+                return '', 304, headers
+
+            require_fresh_reads(max(version[2] for version in versions))
+            result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.headers.extend(headers)
+                return result
+            data, code, *rest = result if isinstance(result, tuple) else (result, 200)
+            if code != 200:
+                return result
+            return data, code, {**(rest[0] if rest else {}), **headers}
+
+        return wrapper
+
+    return decorator
+
+
+def get_fields_param(allowed: tuple) -> tuple:
+    """
+    Функция разбирает квери-параметр fields - список возвращаемых полей через запятую (fields=id,title,year).
+    При неизвестных полях возвращает HTTP-код 400.
+
+    :param allowed: Названия полей, которые можно запросить.
+    :return: Кортеж названий полей без повторов или пустой кортеж, если параметр не передан.
+    """
+    value = request.args.get('fields')
+    if value is None:
+        return ()
+    fields = tuple(dict.fromkeys(filter(None, value.split(','))))
+    if not fields or any(field not in allowed for field in fields):
+        abort(400)
+    return fields
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Функция кодирует ключ последней записи страницы в непрозрачный для клиента курсор.
+
+    :param values: Значения ключа последней записи страницы.
+    :return: Курсор в виде строки, безопасной для использования в URL.
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Функция декодирует курсор, полученный функцией encode_cursor.
+
+    :param cursor: Курсор в виде строки.
+    :return: Значения ключа последней записи страницы.
+    :raises ValueError: Если курсор поврежден.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or not values:
+        raise ValueError('Invalid cursor')
+    # Значения ключа передаются в запрос к базе данных: допустимы только скалярные значения колонок
+    if any(isinstance(value, bool) or not isinstance(value, (int, float, str, type(None))) for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def get_page_params(key_length: int = 1) -> Optional[tuple]:
+    """
+    Функция разбирает квери-параметры постраничного вывода: limit, after_id и cursor
+    (значение поля next предыдущей страницы). При некорректных значениях возвращает HTTP-код 400,
+    в том числе если длина ключа из курсора не совпадает с количеством полей сортировки.
+
+    :param key_length: Количество значений в ключе записи (по умолчанию - только id).
+    :return: None, если постраничный вывод не запрошен, иначе кортеж (after, limit),
+    где after - ключ последней записи предыдущей страницы или None для первой страницы.
+    """
+    args = request.args
+    if not any(key in args for key in ('limit', 'after_id', 'cursor')):
+        return None
+
+    try:
+        limit = int(args.get('limit', PAGE_DEFAULT_LIMIT))
+        if 'cursor' in args:
+            after = decode_cursor(args['cursor'])
+        elif 'after_id' in args:
+            after = [int(args['after_id'])]
+        else:
+            after = None
+    except (TypeError, ValueError):
+        abort(400)
+
+    if after is not None and len(after) != key_length:
+        abort(400)
+    if not 0 < limit <= PAGE_MAX_LIMIT:
+        abort(400)
+    return after, limit
+
+
+def make_page(items: list, limit: int, schema, key=None) -> dict:
+    """
+    Функция формирует ответ с одной страницей записей и курсором следующей страницы.
+    Ожидается, что из базы данных запрошено на одну запись больше limit,
+    наличие этой записи означает, что следующая страница существует.
+
+    :param items: Записи, полученные из базы данных (не более limit + 1).
+    :param limit: Максимальное количество записей на странице.
+    :param schema: Сериализатор marshmallow с параметром many=True.
+    :param key: Функция, возвращающая ключ записи для курсора (по умолчанию - [id]).
+    :return: Словарь с сериализованными записями (items) и курсором следующей страницы (next).
+    """
+    has_next = len(items) > limit
+    items = items[:limit]
+    key = key or (lambda item: [item.id])
+    next_cursor = encode_cursor(key(items[-1])) if has_next else None
+    return {'items': schema.dump(items), 'next': next_cursor}
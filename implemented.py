@@ -1,21 +1,54 @@
+from constants import (CACHE_SETTINGS, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS, LEADERBOARD_SIZE, PWD_HASH_WORKERS,
+                       PWD_HASH_QUEUE_LIMIT, SIMILAR_WEIGHTS, SIMILAR_YEAR_SCALE, SUGGEST_MAX_WORDS,
+                       SUGGEST_MAX_KEY_LENGTH)
+from dao.cache import CachedDAO, create_cache
 from dao.director import DirectorDAO
 from dao.genre import GenreDAO
+from dao.model.director import DirectorSchema
+from dao.model.genre import GenreSchema
+from dao.model.movie import MovieSchema
 from dao.movie import MovieDAO
 from dao.user import UserDAO
 from service.auth import AuthService
 from service.director import DirectorService
 from service.genre import GenreService
+from service.imports import ImportService
+from service.leaderboard import Leaderboard
 from service.movie import MovieService
+from service.password import PasswordHasher
+from service.similar import SimilarService
+from service.suggest import SuggestService
 from service.user import UserService
 from setup_db import db
 
-director_dao = DirectorDAO(session=db.session)
-genre_dao = GenreDAO(session=db.session)
-movie_dao = MovieDAO(session=db.session)
+director_dao = CachedDAO(DirectorDAO(session=db.session), create_cache('director', **CACHE_SETTINGS['director']))
+genre_dao = CachedDAO(GenreDAO(session=db.session), create_cache('genre', **CACHE_SETTINGS['genre']))
+movie_dao = CachedDAO(MovieDAO(session=db.session), create_cache('movie', **CACHE_SETTINGS['movie']))
 user_dao = UserDAO(session=db.session)
 
+password_hasher = PasswordHasher(workers=PWD_HASH_WORKERS, queue_limit=PWD_HASH_QUEUE_LIMIT)
+
 director_service = DirectorService(dao=director_dao)
 genre_service = GenreService(dao=genre_dao)
-movie_service = MovieService(dao=movie_dao)
-user_service = UserService(dao=user_dao)
+movie_service = MovieService(dao=movie_dao, leaderboard=Leaderboard(movie_dao, LEADERBOARD_SIZE))
+user_service = UserService(dao=user_dao, hasher=password_hasher)
 auth_service = AuthService(user_service)
+import_service = ImportService(
+    targets={
+        'movies': (movie_dao, MovieSchema(exclude=('genre', 'director'))),
+        'directors': (director_dao, DirectorSchema()),
+        'genres': (genre_dao, GenreSchema()),
+    },
+    batch_size=IMPORT_BATCH_SIZE,
+    max_errors=IMPORT_MAX_ERRORS,
+)
+suggest_service = SuggestService(
+    sources={
+        'movie': (movie_dao, 'title'),
+        'director': (director_dao, 'name'),
+        'genre': (genre_dao, 'name'),
+    },
+    max_words=SUGGEST_MAX_WORDS,
+    max_key_length=SUGGEST_MAX_KEY_LENGTH,
+)
+similar_service = SimilarService(dao=movie_dao, weights=SIMILAR_WEIGHTS, year_scale=SIMILAR_YEAR_SCALE)
@@ -0,0 +1,189 @@
+from flask import Flask
+from sqlalchemy import inspect
+
+from constants import STATS_MATERIALIZED
+from dao.model.director import Director  # noqa: F401 - модели регистрируют таблицы в db.metadata
+from dao.model.genre import Genre  # noqa: F401
+from dao.model.movie import Movie  # noqa: F401
+from dao.model.movie_stats import MovieStats, STATS_FIELDS, STATS_GROUPINGS
+from dao.model.user import User  # noqa: F401
+from setup_db import db
+
+
+def create_indexes(engine) -> list[str]:
+    """
+    Функция создает индексы, объявленные в моделях, которых еще нет в существующей базе данных.
+    Таблицы не пересоздаются, данные не изменяются. Отсутствующие таблицы пропускаются.
+    :param engine: Engine SQLAlchemy базы данных.
+    :return: Список названий созданных индексов.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+MOVIE_SEARCH_STATEMENTS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS movie_fts_insert AFTER INSERT ON movie BEGIN
+        INSERT INTO movie_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movie_fts_delete AFTER DELETE ON movie BEGIN
+        INSERT INTO movie_fts (movie_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movie_fts_update AFTER UPDATE OF id, title, description ON movie BEGIN
+        INSERT INTO movie_fts (movie_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO movie_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def create_movie_search(engine) -> list[str]:
+    """
+    Функция создает полнотекстовый индекс SQLite FTS5 по названиям и описаниям фильмов (таблица movie_fts)
+    и триггеры, которые обновляют индекс при любой записи в таблицу movie, в том числе массовой загрузке.
+    Индекс хранит только токены (external content), текст читается из таблицы movie.
+    При создании индекс заполняется существующими записями. Для других СУБД шаг пропускается.
+    :param engine: Engine SQLAlchemy базы данных.
+    :return: Список названий созданных объектов.
+    """
+    if engine.dialect.name != 'sqlite':
+        return []
+    existing_tables = set(inspect(engine).get_table_names())
+    if 'movie' not in existing_tables:
+        return []
+
+    created = []
+    with engine.begin() as connection:
+        if 'movie_fts' not in existing_tables:
+            connection.exec_driver_sql(
+                "CREATE VIRTUAL TABLE movie_fts USING fts5("
+                "title, description, content='movie', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            connection.exec_driver_sql("INSERT INTO movie_fts (movie_fts) VALUES ('rebuild')")
+            created.append('movie_fts')
+        for statement in MOVIE_SEARCH_STATEMENTS:
+            connection.exec_driver_sql(statement)
+    return created
+
+
+def stats_statements(row: str, delta: str) -> str:
+    """
+    Функция формирует SQL тела триггера, который добавляет строку movie (new) в группы movie_stats
+    или вычитает ее (old) из групп всех наборов полей группировки.
+    Группа ищется через IS вместо =, чтобы NULL сравнивался как обычное значение.
+    :param row: new или old.
+    :param delta: + или -.
+    :return: SQL операторов тела триггера.
+    """
+    statements = []
+    for group_fields in STATS_GROUPINGS:
+        values = [f'{row}.{field}' if field in group_fields else 'NULL' for field in STATS_FIELDS]
+        key = ' AND '.join([f"group_fields = '{','.join(group_fields)}'"] +
+                           [f'{field} IS {value}' for field, value in zip(STATS_FIELDS, values)])
+        if delta == '+':
+            statements.append(
+                f"INSERT INTO movie_stats (group_fields, {', '.join(STATS_FIELDS)}, movie_count, rating_count, "
+                f"rating_sum) SELECT '{','.join(group_fields)}', {', '.join(values)}, 0, 0, 0 "
+                f"WHERE NOT EXISTS (SELECT 1 FROM movie_stats WHERE {key});"
+            )
+        statements.append(
+            f'UPDATE movie_stats SET movie_count = movie_count {delta} 1, '
+            f'rating_count = rating_count {delta} ({row}.rating IS NOT NULL), '
+            f'rating_sum = rating_sum {delta} coalesce({row}.rating, 0) WHERE {key};'
+        )
+        if delta == '-' and group_fields:
+            statements.append(f'DELETE FROM movie_stats WHERE {key} AND movie_count <= 0;')
+    return '\n'.join(statements)
+
+
+MOVIE_STATS_TRIGGERS = {
+    'movie_stats_insert': f"AFTER INSERT ON movie BEGIN {stats_statements('new', '+')} END",
+    'movie_stats_delete': f"AFTER DELETE ON movie BEGIN {stats_statements('old', '-')} END",
+    'movie_stats_update': f"AFTER UPDATE OF genre_id, director_id, year, rating ON movie "
+                          f"BEGIN {stats_statements('old', '-')} {stats_statements('new', '+')} END",
+}
+
+
+def create_movie_stats(engine) -> list[str]:
+    """
+    Функция создает сводную таблицу статистики фильмов movie_stats и триггеры, которые обновляют ее
+    при каждой записи в таблицу movie (изменяются только строки групп записанного фильма,
+    по одной на каждый набор полей группировки).
+    При создании триггеров таблица заполняется заново по существующим записям.
+    Если материализация отключена (STATS_MATERIALIZED), триггеры удаляются, чтобы не замедлять запись.
+    Для других СУБД шаг пропускается.
+    :param engine: Engine SQLAlchemy базы данных.
+    :return: Список названий созданных объектов.
+    """
+    if engine.dialect.name != 'sqlite':
+        return []
+    existing_tables = set(inspect(engine).get_table_names())
+    if 'movie' not in existing_tables:
+        return []
+
+    created = []
+    with engine.begin() as connection:
+        existing_triggers = {row[0] for row in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'movie'")}
+        if not STATS_MATERIALIZED:
+            for name in MOVIE_STATS_TRIGGERS:
+                connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+            return []
+
+        if 'movie_stats' not in existing_tables:
+            MovieStats.__table__.create(bind=connection)
+            created.append('movie_stats')
+        missing = [name for name in MOVIE_STATS_TRIGGERS if name not in existing_triggers]
+        if missing:
+            for name in MOVIE_STATS_TRIGGERS:
+                connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                connection.exec_driver_sql(f'CREATE TRIGGER {name} {MOVIE_STATS_TRIGGERS[name]}')
+            connection.exec_driver_sql('DELETE FROM movie_stats')
+            for group_fields in STATS_GROUPINGS:
+                values = [field if field in group_fields else 'NULL' for field in STATS_FIELDS]
+                # Итог по всем фильмам (пустой набор полей) хранится всегда, даже при пустой таблице movie
+                group_by = f"GROUP BY {', '.join(group_fields)}" if group_fields else ''
+                connection.exec_driver_sql(
+                    f"INSERT INTO movie_stats (group_fields, {', '.join(STATS_FIELDS)}, movie_count, rating_count, "
+                    f"rating_sum) SELECT '{','.join(group_fields)}', {', '.join(values)}, count(*), count(rating), "
+                    f"coalesce(sum(rating), 0) FROM movie {group_by}"
+                )
+            created.extend(MOVIE_STATS_TRIGGERS)
+    return created
+
+
+MIGRATIONS = [
+    create_indexes,
+    create_movie_search,
+    create_movie_stats,
+]
+
+
+def migrate(app: Flask) -> None:
+    """
+    Функция последовательно применяет шаги миграции к базе данных приложения.
+    Вызывается явно: командой FLASK_APP=app flask migrate, при запуске python app.py и server.py,
+    но не при импорте приложения. Каждый шаг идемпотентен, поэтому повторный вызов ничего не меняет.
+    :param app: Сконфигурированное Flask-приложение.
+    :return: None
+    """
+    with app.app_context():
+        engine = db.get_engine(app)
+        for step in MIGRATIONS:
+            step(engine)
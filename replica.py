@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from flask import Flask, current_app, request
+
+from setup_db import REPLICA_BIND, db
+
+
+class ReplicaSync:
+    """
+    Класс описывает синхронизацию локальной реплики SQLite: файл основной базы данных периодически
+    копируется в файл реплики средствами sqlite3 backup API (копия согласована на момент начала копирования).
+    Время начала последнего успешного копирования записывается в файл <реплика>.synced,
+    чтобы его видели все процессы сервера (см. synced_at).
+    """
+
+    def __init__(self, primary_path: str, replica_path: str, interval: float):
+        """
+        Метод инициализирует синхронизацию.
+        :param primary_path: Путь к файлу основной базы данных.
+        :param replica_path: Путь к файлу реплики.
+        :param interval: Период синхронизации в секундах.
+        """
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.marker_path = f'{replica_path}.synced'
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self) -> float:
+        """
+        Метод копирует основную базу данных в реплику.
+        :return: Время начала копирования в секундах от начала эпохи Unix.
+        """
+        started = time.time()
+        source = sqlite3.connect(self.primary_path, timeout=30)
+        target = sqlite3.connect(self.replica_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        marker = f'{self.marker_path}.{os.getpid()}'
+        with open(marker, 'w') as file:
+            file.write(repr(started))
+        os.replace(marker, self.marker_path)
+        return started
+
+    def synced_at(self) -> float:
+        """
+        Метод возвращает время, на которое данные реплики совпадают с основной базой данных.
+        :return: Время в секундах от начала эпохи Unix или 0, если реплика ни разу не синхронизировалась.
+        """
+        try:
+            with open(self.marker_path) as file:
+                return float(file.read())
+        except (OSError, ValueError):
+            return 0.0
+
+    def start(self) -> None:
+        """
+        Метод выполняет первую синхронизацию и запускает фоновый поток периодической синхронизации.
+        Остановленную синхронизацию можно запустить снова (см. server.py: поток останавливается на время fork).
+        """
+        self._stop.clear()
+        self.sync()
+        self._thread = threading.Thread(target=self._run, name='replica-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Метод останавливает фоновый поток синхронизации.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except sqlite3.Error:
+                # Следующая попытка - через interval, до нее чтение по устаревшей реплике уходит в основную базу
+                continue
+
+
+def register_replica(app: Flask) -> None:
+    """
+    Функция подключает реплику для чтения, если в SQLALCHEMY_BINDS задан bind replica:
+    - при REPLICA_SYNC_INTERVAL > 0 реплика SQLite синхронизируется с основной базой данных в фоновом потоке;
+    - запросы с изменением данных (POST, PUT, PATCH, DELETE) выполняются только в основной базе данных,
+    а после них в течение REPLICA_STICKY_SECONDS все запросы этого клиента тоже читают из основной базы данных
+    (cookie с временем окончания, read-your-writes).
+    :param app: Сконфигурированное Flask-приложение.
+    :return: None
+    """
+    if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    interval = app.config.get('REPLICA_SYNC_INTERVAL', 0)
+    if interval > 0:
+        with app.app_context():
+            primary = db.get_engine(app)
+            replica = db.get_engine(app, bind=REPLICA_BIND)
+        replica_sync = ReplicaSync(primary.url.database, replica.url.database, interval)
+        replica_sync.start()
+        app.extensions['replica_sync'] = replica_sync
+
+    cookie = app.config.get('REPLICA_STICKY_COOKIE', 'read_primary_until')
+    sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+    @app.before_request
+    def route_to_primary() -> None:
+        try:
+            sticky_until = float(request.cookies.get(cookie, 0))
+        except ValueError:
+            sticky_until = 0
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') or sticky_until > time.time():
+            db.session.info['primary'] = True
+
+    @app.after_request
+    def stick_to_primary(response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            expires = time.time() + sticky_seconds
+            response.set_cookie(cookie, repr(expires), max_age=sticky_seconds, httponly=True)
+        return response
+
+
+def require_fresh_reads(modified_at: Optional[float]) -> None:
+    """
+    Функция направляет чтение текущего запроса в основную базу данных, если данные изменились
+    после последней синхронизации реплики. Без этого клиент получил бы устаревшие данные
+    с ETag новой версии (см. helpers.conditional_get).
+    :param modified_at: Время последнего изменения читаемых данных (None - неизвестно).
+    :return: None
+    """
+    replica_sync = current_app.extensions.get('replica_sync')
+    if replica_sync is None:
+        return
+    if modified_at is None or modified_at >= replica_sync.synced_at():
+        db.session.info['primary'] = True
@@ -0,0 +1,315 @@
+"""
+Запуск приложения в production: пул процессов (pre-fork) с общим прогревом.
+
+Родительский процесс (мастер) один раз импортирует приложение и прогревает его: применяет миграции,
+строит сериализаторы, правила маршрутизации, индексы подсказок, рейтинг лучших фильмов и каталог похожих
+фильмов, заполняет кеши справочников. После этого он открывает слушающий сокет и создает fork воркеров:
+воркеры наследуют прогретое приложение (страницы памяти общие до первой записи, copy-on-write)
+и принимают соединения с общего сокета, поэтому первый запрос воркера не ждет загрузки индексов.
+Каждый воркер - многопоточный сервер Werkzeug; процессы не делят GIL, поэтому пропускная способность
+растет с количеством ядер процессора.
+
+Сигналы мастеру:
+- HUP - плавная перезагрузка: мастер заново прогревает приложение по текущим данным, запускает новые воркеры,
+  а старые перестают принимать соединения, завершают начатые запросы и выходят;
+- TERM, INT - плавная остановка: воркеры завершают начатые запросы (не дольше --graceful-timeout);
+- QUIT - немедленная остановка.
+Воркер перезапускается после --max-requests запросов (плюс случайная добавка до --max-requests-jitter,
+чтобы воркеры не перезапускались одновременно), а также после аварийного завершения.
+Код приложения загружается один раз, поэтому для обновления кода сервер нужно перезапустить.
+
+Кеши в памяти процесса (CACHE_BACKEND=memory) у каждого воркера свои и не видят записи других воркеров,
+поэтому при нескольких воркерах по умолчанию используется общий кеш CACHE_BACKEND=sqlite (см. dao.cache):
+версии данных общие, и индексы воркеров загружаются заново после записи в другом процессе.
+Конфигурация по умолчанию - production (APP_CONFIG). Только для Unix (os.fork).
+
+Запуск:
+    python server.py --workers 4 --port 10001
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+
+from werkzeug.serving import ThreadedWSGIServer
+
+logger = logging.getLogger('server')
+
+SIGNALS = {signal.SIGCHLD, signal.SIGHUP, signal.SIGINT, signal.SIGQUIT, signal.SIGTERM}
+
+
+class WorkerServer(ThreadedWSGIServer):
+    """
+    Класс описывает многопоточный сервер Werkzeug воркера, который принимает соединения с общим слушающим сокетом.
+    Остановка (stop) плавная: сервер перестает принимать соединения и ждет завершения начатых запросов.
+    """
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, listener: socket.socket, app, max_requests: int):
+        """
+        Метод инициализирует сервер.
+        :param listener: Слушающий сокет мастера
+        (неблокирующий: соединение, принятое другим воркером, не блокирует accept).
+        :param app: WSGI-приложение.
+        :param max_requests: Количество запросов, после которого воркер завершается (0 - без ограничения).
+        """
+        super().__init__(listener.getsockname()[0], 0, app, fd=listener.fileno())
+        self.max_requests = max_requests
+        self.handled = 0
+
+    def get_request(self) -> tuple:
+        connection, address = super().get_request()
+        connection.setblocking(True)
+        return connection, address
+
+    def process_request(self, request, client_address) -> None:
+        super().process_request(request, client_address)
+        # Werkzeug отвечает по HTTP/1.0: одно соединение - один запрос
+        self.handled += 1
+        if self.handled == self.max_requests:
+            self.stop()
+
+    def stop(self) -> None:
+        """
+        Метод останавливает прием соединений. Вызывается из обработчика сигнала или потока запроса,
+        поэтому shutdown (ожидает выхода из serve_forever) выполняется в отдельном потоке.
+        """
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def warm_up(app) -> None:
+    """
+    Функция прогревает приложение перед созданием воркеров: загружает индексы и кеши, которые иначе
+    загружались бы при первом запросе каждого воркера, и закрывает соединения с базой данных,
+    чтобы воркеры не использовали соединения SQLite, открытые в другом процессе.
+    :param app: Flask-приложение.
+    :return: None
+    """
+    from constants import LEADERBOARD_SIZE
+    from implemented import director_dao, genre_dao, movie_service, similar_service, suggest_service
+    from setup_db import db
+
+    with app.app_context():
+        suggest_service.build_all()
+        similar_service.build()
+        movie_service.get_top(None, LEADERBOARD_SIZE)
+        for genre in genre_dao.get_all():
+            movie_service.get_top(genre.id, LEADERBOARD_SIZE)
+        director_dao.get_all()
+        db.session.remove()
+        for bind in [None, *(app.config.get('SQLALCHEMY_BINDS') or {})]:
+            db.get_engine(app, bind=bind).dispose()
+    app.url_map.update()
+    # Объекты прогретого приложения больше не просматриваются сборщиком мусора:
+    # иначе он записывал бы в их заголовки и копировал общие страницы памяти в каждый воркер
+    gc.collect()
+    gc.freeze()
+
+
+class Arbiter:
+    """
+    Класс описывает мастер-процесс: создает воркеры, заменяет завершившиеся, обрабатывает сигналы
+    плавной перезагрузки и остановки.
+    """
+
+    def __init__(self, app, listener: socket.socket, workers: int, max_requests: int, max_requests_jitter: int,
+                 graceful_timeout: float):
+        """
+        Метод инициализирует мастер.
+        :param app: Прогретое Flask-приложение.
+        :param listener: Слушающий сокет.
+        :param workers: Количество воркеров.
+        :param max_requests: Количество запросов, после которого воркер перезапускается (0 - без ограничения).
+        :param max_requests_jitter: Максимальная случайная добавка к max_requests.
+        :param graceful_timeout: Время в секундах на завершение начатых запросов при остановке воркера.
+        """
+        self.app = app
+        self.listener = listener
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        # pid воркера -> время, после которого останавливаемый воркер завершается принудительно (None - рабочий)
+        self.children = {}
+
+    def run(self) -> None:
+        """
+        Метод запускает воркеры и обрабатывает сигналы до остановки сервера.
+        """
+        signal.pthread_sigmask(signal.SIG_BLOCK, SIGNALS)
+        self.spawn(self.workers)
+        while True:
+            info = signal.sigtimedwait(SIGNALS, 1.0)
+            self.reap()
+            signum = info.si_signo if info else None
+            if signum == signal.SIGHUP:
+                self.reload()
+            elif signum in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT):
+                self.stop(graceful=signum != signal.SIGQUIT)
+                return
+            self.kill_expired()
+            self.spawn(self.workers - sum(deadline is None for deadline in self.children.values()))
+
+    def spawn(self, count: int) -> None:
+        """
+        Метод создает воркеры.
+        :param count: Количество воркеров.
+        """
+        if count <= 0:
+            return
+        # Поток синхронизации реплики останавливается на время fork, чтобы fork не пришелся на копирование базы
+        replica_sync = self.app.extensions.get('replica_sync')
+        if replica_sync is not None:
+            replica_sync.stop()
+        try:
+            for _ in range(count):
+                max_requests = self.max_requests and self.max_requests + random.randint(0, self.max_requests_jitter)
+                pid = os.fork()
+                if pid == 0:
+                    self.run_worker(max_requests)
+                self.children[pid] = None
+                logger.info('worker %s started', pid)
+        finally:
+            if replica_sync is not None:
+                replica_sync.start()
+
+    def run_worker(self, max_requests: int) -> None:
+        """
+        Метод выполняется в процессе воркера и не возвращает управление.
+        :param max_requests: Количество запросов, после которого воркер завершается.
+        """
+        code = 1
+        try:
+            server = WorkerServer(self.listener, self.app, max_requests)
+            # У сервера своя копия дескриптора: сокет закрывается, как только воркер перестает принимать соединения
+            self.listener.close()
+            signal.signal(signal.SIGTERM, lambda *_: server.stop())
+            # INT (Ctrl+C) получает вся группа процессов: воркеры останавливает мастер
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGQUIT, signal.SIG_DFL)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, SIGNALS)
+            server.serve_forever()
+            code = 0
+        except Exception:
+            logger.exception('worker %s failed', os.getpid())
+        finally:
+            # os._exit не выполняет обработчики atexit: пул хеширования паролей воркера останавливается явно
+            try:
+                from implemented import password_hasher
+                password_hasher.shutdown()
+            finally:
+                os._exit(code)
+
+    def reap(self) -> None:
+        """
+        Метод удаляет из списка завершившиеся воркеры.
+        """
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            deadline = self.children.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and deadline is None:
+                logger.error('worker %s exited with code %s', pid, code)
+
+    def retire(self, pids: list) -> None:
+        """
+        Метод плавно останавливает воркеры: после graceful_timeout они завершаются принудительно (см. kill_expired).
+        :param pids: Список pid воркеров.
+        """
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.children[pid] = deadline
+            self.signal(pid, signal.SIGTERM)
+
+    def kill_expired(self) -> None:
+        """
+        Метод принудительно завершает воркеры, не успевшие остановиться за graceful_timeout.
+        """
+        now = time.monotonic()
+        for pid, deadline in list(self.children.items()):
+            if deadline is not None and deadline < now:
+                self.signal(pid, signal.SIGKILL)
+
+    def reload(self) -> None:
+        """
+        Метод выполняет плавную перезагрузку: прогревает приложение по текущим данным (воркеры записывали данные,
+        и индексы мастера устарели), запускает новые воркеры и плавно останавливает старые.
+        """
+        logger.info('reloading')
+        old = [pid for pid, deadline in self.children.items() if deadline is None]
+        warm_up(self.app)
+        self.spawn(self.workers)
+        self.retire(old)
+
+    def stop(self, graceful: bool) -> None:
+        """
+        Метод останавливает воркеры и ждет их завершения.
+        :param graceful: True - воркеры завершают начатые запросы, False - завершаются немедленно.
+        """
+        logger.info('stopping')
+        self.listener.close()
+        if graceful:
+            self.retire([pid for pid, deadline in self.children.items() if deadline is None])
+        else:
+            for pid in self.children:
+                self.signal(pid, signal.SIGKILL)
+        while self.children:
+            self.kill_expired()
+            signal.sigtimedwait({signal.SIGCHLD}, 0.1)
+            self.reap()
+        replica_sync = self.app.extensions.get('replica_sync')
+        if replica_sync is not None:
+            replica_sync.stop()
+
+    @staticmethod
+    def signal(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=10001)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-requests', type=int, default=10_000)
+    parser.add_argument('--max-requests-jitter', type=int, default=1_000)
+    parser.add_argument('--graceful-timeout', type=float, default=30)
+    parser.add_argument('--backlog', type=int, default=1_024)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    # Переменные окружения задаются до импорта приложения: конфигурация и тип кеша читаются при импорте
+    os.environ.setdefault('APP_CONFIG', 'production')
+    if args.workers > 1:
+        os.environ.setdefault('CACHE_BACKEND', 'sqlite')
+    from app import app
+    from constants import CACHE_BACKEND
+    from migrations import migrate
+    if args.workers > 1 and CACHE_BACKEND != 'sqlite':
+        parser.error('several workers require the shared cache: CACHE_BACKEND=sqlite')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(message)s')
+    migrate(app)
+    warm_up(app)
+    listener = socket.create_server((args.host, args.port), backlog=args.backlog)
+    listener.setblocking(False)
+    logger.info('listening on %s:%s, %s workers', args.host, args.port, args.workers)
+    Arbiter(app, listener, args.workers, args.max_requests, args.max_requests_jitter, args.graceful_timeout).run()
+
+
+if __name__ == '__main__':
+    main()
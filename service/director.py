@@ -1,4 +1,7 @@
+from typing import Optional
+
 from dao.director import DirectorDAO
+from service.unit_of_work import transactional
 
 
 class DirectorService:
@@ -31,6 +34,27 @@ class DirectorService:
         """
         return self.dao.get_all()
 
+    def get_page(self, after: Optional[list], limit: int) -> list:
+        """
+        Метод реализует постраничное получение записей о режиссеров из базы данных.
+
+        :param after: Ключ последней записи предыдущей страницы (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :return: Ответ базы данных на запрос получения страницы записей.
+        """
+        return self.dao.get_page(after, limit)
+
+    def get_columns(self, fields: tuple, after: Optional[list] = None, limit: Optional[int] = None) -> list:
+        """
+        Метод реализует получение записей о режиссерах только с выбранными полями.
+        :param fields: Названия выбираемых полей.
+        :param after: Ключ последней записи предыдущей страницы (None - с начала таблицы).
+        :param limit: Максимальное количество записей (None - без ограничения).
+        :return: Строки результата запроса.
+        """
+        return self.dao.get_columns(fields, after, limit)
+
+    @transactional
     def create(self, data: dict) -> None:
         """
         Метод реализует запись новых данных в базу данных.
@@ -39,6 +63,7 @@ class DirectorService:
         """
         return self.dao.create(data)
 
+    @transactional
     def update(self, did: int, data: dict) -> None:
         """
         Метод реализует обновление записи о фильме в базах данных.
@@ -53,6 +78,7 @@ class DirectorService:
 
         self.dao.update(director)
 
+    @transactional
     def delete(self, did: int) -> None:
         """
         Метод реализует удаление записи о фильме в базе данных по id.
@@ -0,0 +1,153 @@
+import csv
+import json
+from typing import Iterable
+
+from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from service.unit_of_work import UnitOfWork
+
+
+class ImportService:
+    """
+    Класс описывает сервис массовой загрузки данных в таблицы фильмов, режиссеров и жанров
+    из файлов JSON Lines и CSV. Каждая строка проверяется сериализатором marshmallow,
+    корректные строки записываются пачками: одна транзакция (единица работы) и один запрос INSERT на пачку.
+    """
+
+    def __init__(self, targets: dict, batch_size: int, max_errors: int):
+        """
+        Метод инициализирует сервис.
+
+        :param targets: Словарь {название таблицы: (DAO объект, сериализатор marshmallow)}.
+        :param batch_size: Количество строк в одной транзакции.
+        :param max_errors: Максимальное количество ошибок, описание которых возвращается в отчете.
+        """
+        self.targets = targets
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def import_lines(self, kind: str, lines: Iterable[str], data_format: str) -> dict:
+        """
+        Метод реализует загрузку данных из строк файла.
+        Строки с ошибками пропускаются и попадают в отчет, остальные записываются в базу данных.
+
+        :param kind: Название таблицы (movies, directors, genres).
+        :param lines: Строки файла (Utf8Lines или текстовый файл).
+        :param data_format: Формат файла: jsonl или csv.
+        :return: Отчет: количество записанных строк, количество ошибок и их описание.
+        :raises ValueError: Если таблица или формат не поддерживаются.
+        """
+        if kind not in self.targets:
+            raise ValueError(f'Unknown import target: {kind}')
+        if data_format not in ('jsonl', 'csv'):
+            raise ValueError(f'Unknown import format: {data_format}')
+
+        dao, schema = self.targets[kind]
+        lines = LineCounter(lines)
+        records = iter(csv.DictReader(lines) if data_format == 'csv' else lines)
+        report = {'imported': 0, 'failed': 0, 'errors': []}
+        batch = []
+
+        # Чтение строки тоже может завершиться ошибкой (не UTF-8, некорректный CSV): она попадает в отчет.
+        # Номер строки - номер в файле: для CSV с учетом заголовка, для многострочных полей - последняя строка записи
+        while True:
+            try:
+                record = next(records)
+            except StopIteration:
+                break
+            except (csv.Error, UnicodeDecodeError) as e:
+                self._add_error(report, lines.count, str(e))
+                continue
+            number = lines.count
+
+            try:
+                if data_format == 'csv':
+                    record = {key: value for key, value in record.items() if value != ''}
+                elif record.strip():
+                    record = json.loads(record)
+                else:
+                    continue
+                batch.append((number, schema.load(record)))
+            except (ValueError, ValidationError) as e:
+                self._add_error(report, number, e.messages if isinstance(e, ValidationError) else str(e))
+
+            if len(batch) >= self.batch_size:
+                self._write_batch(dao, batch, report)
+                batch = []
+
+        if batch:
+            self._write_batch(dao, batch, report)
+        # Ошибки записи пачки находятся позже ошибок разбора строк
+        report['errors'].sort(key=lambda error: error['line'])
+        return report
+
+    def _write_batch(self, dao, batch: list, report: dict) -> None:
+        try:
+            with UnitOfWork(dao.session):
+                report['imported'] += dao.bulk_create([row for _, row in batch])
+        except IntegrityError as e:
+            if len(batch) == 1:
+                self._add_error(report, batch[0][0], str(e.orig))
+                return
+            # Пачка отменена целиком: строки записываются по одной, чтобы в отчет попали номера строк с ошибками
+            for item in batch:
+                self._write_batch(dao, [item], report)
+
+    def _add_error(self, report: dict, line: int, messages) -> None:
+        report['failed'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'line': line, 'messages': messages})
+
+
+class LineCounter:
+    """
+    Класс описывает итератор строк файла, который считает прочитанные строки, в том числе строки,
+    при чтении которых возникла ошибка (например, UnicodeDecodeError в Utf8Lines).
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        """
+        Метод инициализирует итератор.
+        :param lines: Строки файла.
+        """
+        self.lines = iter(lines)
+        self.count = 0
+
+    def __iter__(self) -> 'LineCounter':
+        return self
+
+    def __next__(self) -> str:
+        self.count += 1
+        return next(self.lines)
+
+
+class Utf8Lines:
+    """
+    Класс описывает итератор строк файла в кодировке UTF-8 по строкам в байтах (тело запроса, файл в режиме rb).
+    Каждая строка декодируется отдельно: строка не в UTF-8 вызывает UnicodeDecodeError только при ее чтении,
+    и чтение продолжается со следующей строки (io.TextIOWrapper декодирует блоками, и номер строки теряется).
+    """
+
+    def __init__(self, lines: Iterable[bytes]):
+        """
+        Метод инициализирует итератор.
+        :param lines: Строки в байтах с символами конца строки.
+        """
+        self.lines = iter(lines)
+
+    def __iter__(self) -> 'Utf8Lines':
+        return self
+
+    def __next__(self) -> str:
+        return next(self.lines).decode('utf-8')
+
+
+def detect_format(name: str) -> str:
+    """
+    Функция определяет формат файла загрузки по расширению или MIME-типу.
+
+    :param name: Имя файла или значение заголовка Content-Type.
+    :return: csv или jsonl.
+    """
+    return 'csv' if name.endswith('csv') or name.startswith('text/csv') else 'jsonl'
@@ -0,0 +1,119 @@
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from typing import Optional
+
+from dao.movie import MovieQuery
+from setup_db import use_primary
+
+TopMovie = namedtuple('TopMovie', MovieQuery.selectable)
+
+
+class Leaderboard:
+    """
+    Класс описывает рейтинг лучших фильмов (по всем жанрам и по каждому жанру) в памяти процесса.
+    Для каждого жанра хранится не более capacity фильмов с наибольшим рейтингом, упорядоченных по убыванию
+    рейтинга и id (как в запросе sort=-rating), поэтому чтение первых limit фильмов выполняется за O(limit).
+    Фильмы без рейтинга в рейтинг не попадают.
+
+    Рейтинг жанра загружается из базы данных при первом обращении (по индексу genre_id, rating) и обновляется
+    по уведомлениям CachedDAO о записи фильмов в этом процессе (создание, изменение и удаление через MovieService).
+    Если после удаления в рейтинге жанра осталось меньше size фильмов, а в базе данных могут быть другие,
+    рейтинг жанра загружается заново. Версия рейтинга сдвигается только на следующую по порядку версию данных,
+    иначе (запись в другом процессе, массовая загрузка) все рейтинги загружаются заново при следующем чтении.
+    """
+
+    def __init__(self, dao, size: int):
+        """
+        Метод инициализирует рейтинг и подписывается на запись через кеширующий DAO фильмов.
+        :param dao: Кеширующий DAO фильмов (CachedDAO над MovieDAO).
+        :param size: Максимальное количество фильмов, которое можно запросить.
+        """
+        self.dao = dao
+        self.size = size
+        self.capacity = 2 * size
+        self.boards = {}
+        self.version = None
+        self._lock = threading.Lock()
+        dao.subscribe(self._on_write)
+
+    @staticmethod
+    def _key(movie) -> tuple:
+        return -movie.rating, -movie.id
+
+    def _load(self, genre_id: Optional[int]) -> dict:
+        with use_primary(self.dao.session):
+            rows = self.dao.get_top(genre_id, self.capacity, MovieQuery.selectable)
+        items = [TopMovie(*row) for row in rows]
+        board = {
+            'keys': [self._key(item) for item in items],
+            'items': items,
+            # Рейтинг содержит все фильмы жанра с рейтингом: новый фильм можно добавить в любое место
+            'complete': len(items) < self.capacity,
+        }
+        self.boards[genre_id] = board
+        return board
+
+    def get_top(self, genre_id: Optional[int], limit: int) -> list:
+        """
+        Метод возвращает фильмы с наибольшим рейтингом.
+        :param genre_id: id жанра (None - все жанры).
+        :param limit: Количество фильмов (не больше size).
+        :return: Список фильмов с полями MovieQuery.selectable, упорядоченный по убыванию рейтинга.
+        :raises ValueError: Если limit больше size.
+        """
+        if limit > self.size:
+            raise ValueError(f'Leaderboard limit must not exceed {self.size}')
+        with self._lock:
+            version = self.dao.version()
+            if self.version is None or self.version[:2] != version[:2]:
+                self.boards.clear()
+                self.version = version
+            board = self.boards.get(genre_id) or self._load(genre_id)
+            return board['items'][:limit]
+
+    def _remove(self, genre_id: Optional[int], movie_id: int) -> None:
+        board = self.boards.get(genre_id)
+        if board is None:
+            return
+        for position, item in enumerate(board['items']):
+            if item.id == movie_id:
+                del board['keys'][position]
+                del board['items'][position]
+                if not board['complete'] and len(board['items']) < self.size:
+                    del self.boards[genre_id]
+                return
+
+    def _add(self, genre_id: Optional[int], item: TopMovie) -> None:
+        # Рейтинг мог быть загружен после фиксации записи и уже содержать фильм: он не должен попасть в рейтинг дважды
+        self._remove(genre_id, item.id)
+        board = self.boards.get(genre_id)
+        if board is None:
+            return
+        key = self._key(item)
+        if not board['complete'] and (not board['keys'] or key > board['keys'][-1]):
+            return
+        position = bisect_left(board['keys'], key)
+        board['keys'].insert(position, key)
+        board['items'].insert(position, item)
+        if len(board['items']) > self.capacity:
+            del board['keys'][-1]
+            del board['items'][-1]
+            board['complete'] = False
+
+    def _on_write(self, old_id: Optional[int], entity, version: tuple) -> None:
+        with self._lock:
+            current = self.version
+            contiguous = current is not None and current[0] == version[0] and current[1] + 1 == version[1]
+            if not contiguous or (old_id is None and entity is None):
+                self.boards.clear()
+                self.version = None
+                return
+            if old_id is not None:
+                for genre_id in list(self.boards):
+                    self._remove(genre_id, old_id)
+            if entity is not None and entity.rating is not None:
+                item = TopMovie(*(getattr(entity, field) for field in MovieQuery.selectable))
+                self._add(None, item)
+                self._add(entity.genre_id, item)
+            self.version = version
@@ -1,17 +1,33 @@
-from dao.movie import MovieDAO
+from typing import Iterator, Optional
+
+from marshmallow import ValidationError
+
+from constants import SEARCH_MAX_TERMS, STATS_MATERIALIZED, STREAM_CHUNK_SIZE
+from dao.model.movie import MovieSchema
+from dao.movie import MovieDAO, MovieQuery
+from service.leaderboard import Leaderboard
+from service.unit_of_work import transactional
+
+# Проверка изменений из пакетного запроса: только поля таблицы movie, все поля необязательные
+movie_change_schema = MovieSchema(exclude=('genre', 'director'), partial=True)
+# Проверка данных частичного изменения одного фильма: id фильма задается в адресе запроса
+movie_patch_schema = MovieSchema(exclude=('id', 'genre', 'director'), partial=True)
 
 
 class MovieService:
     """
     Класс описывает сервисы для работы в приложении Flask с таблицей фильмов.
     """
-    def __init__(self, dao: MovieDAO):
+    def __init__(self, dao: MovieDAO, leaderboard: Optional[Leaderboard] = None):
         """
         Метод инициализирует DAO
         :param dao: DAO объект
+        :param leaderboard: Рейтинг лучших фильмов в памяти (None - рейтинг читается из базы данных).
         """
         self.dao = dao
+        self.leaderboard = leaderboard
 
+    @transactional
     def create(self, data: dict) -> None:
         """
         Метод реализует запись новых данных в базу данных.
@@ -21,15 +37,17 @@ class MovieService:
         """
         return self.dao.create(data)
 
-    def get_one(self, mid: int) -> None or list:
+    def get_one(self, mid: int, expand: tuple = (), fields: tuple = ()) -> None or list:
         """
         Метод реализует получение записи об одном фильме из базы данных по id.
 
         :param mid: id фильма в базе данных.
+        :param expand: Названия связей (director, genre), загружаемых вместе с фильмом.
+        :param fields: Названия выбираемых полей (по умолчанию - все поля).
         :return: Ответ базы данных на запрос о получении записи о фильме по id.
         При отсутствии id в базе данных возвращает None.
         """
-        movie = self.dao.get_one(mid)
+        movie = self.dao.get_one(mid, expand, fields)
         if not movie:
             return None
         return movie
@@ -42,33 +60,73 @@ class MovieService:
         """
         return self.dao.get_all()
 
-    def get_all_on_director(self, director_id: int) -> list:
+    def get_filtered(self, movie_query: MovieQuery) -> list:
         """
-        Метод реализует получение записей о всех фильмах по конкретному режиссеру.
+        Метод реализует получение записей о фильмах, удовлетворяющих условиям построителя запроса.
 
-        :param director_id: id режиссера в базе данных.
-        :return: Ответ базы данных на запрос к базе данных.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :return: Ответ базы данных на запрос.
         """
-        return self.dao.get_all_on_director(director_id)
+        return self.dao.get_filtered(movie_query)
 
-    def get_all_on_genre(self, genre_id: int) -> list:
+    def iter_filtered(self, movie_query: MovieQuery) -> Iterator:
         """
-        Метод реализует получение записей о всех фильмах по конкретному жанру.
+        Метод реализует потоковое получение записей о фильмах, удовлетворяющих условиям построителя запроса.
 
-        :param genre_id: id жанра к базе данных.
-        :return: Ответ базы данных на запрос.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :return: Итератор записей.
         """
-        return self.dao.get_all_on_genre(genre_id)
+        return self.dao.iter_filtered(movie_query, STREAM_CHUNK_SIZE)
 
-    def get_all_by_year(self, year: int) -> list:
+    def get_page(self, after: Optional[list], limit: int, movie_query: Optional[MovieQuery] = None) -> list:
         """
-        Метод реализует получение записей о всех фильмах по конкретному году выпуска.
+        Метод реализует постраничное получение записей о фильмах из базы данных.
 
-        :param year: Год выпуска фильма.
-        :return: Ответ базы данных на запрос.
+        :param after: Ключ последней записи предыдущей страницы (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :param movie_query: Построитель запроса с условиями фильтрации и сортировкой.
+        :return: Ответ базы данных на запрос получения страницы записей.
         """
-        return self.dao.get_all_by_year(year)
+        return self.dao.get_page(after, limit, movie_query)
 
+    def get_stats(self, group_by: tuple) -> list:
+        """
+        Метод реализует получение статистики фильмов (количество и средний рейтинг) с группировкой.
+        Если включена материализация (STATS_MATERIALIZED), статистика считается по сводной таблице movie_stats.
+        :param group_by: Поля группировки: genre_id, director_id, year.
+        :return: Строки с полями группировки, количеством фильмов (count) и средним рейтингом (avg_rating).
+        :raises ValueError: Если поле группировки не поддерживается.
+        """
+        return self.dao.get_stats(group_by, STATS_MATERIALIZED)
+
+    def get_top(self, genre_id: Optional[int], limit: int) -> list:
+        """
+        Метод реализует получение фильмов с наибольшим рейтингом.
+        :param genre_id: id жанра (None - все жанры).
+        :param limit: Количество фильмов.
+        :return: Фильмы, упорядоченные по убыванию рейтинга, при равном рейтинге - по убыванию id.
+        :raises ValueError: Если limit больше размера рейтинга в памяти.
+        """
+        if self.leaderboard is None:
+            return self.dao.get_top(genre_id, limit)
+        return self.leaderboard.get_top(genre_id, limit)
+
+    def search(self, text: str, after: Optional[list], limit: int, fields: tuple = ()) -> list:
+        """
+        Метод реализует полнотекстовый поиск фильмов по названию и описанию, результаты упорядочены по релевантности.
+        :param text: Поисковая строка пользователя.
+        :param after: Ключ последней записи предыдущей страницы [релевантность, id] (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :param fields: Названия выбираемых полей (по умолчанию - все поля).
+        :return: Строки с полями фильма и релевантностью (поле score).
+        :raises ValueError: Если в поисковой строке нет слов или курсор некорректен.
+        """
+        match = self.dao.match_expression(text, SEARCH_MAX_TERMS)
+        if match is None:
+            raise ValueError('Empty search query')
+        return self.dao.search(match, after, limit, fields)
+
+    @transactional
     def update(self, mid: int, data: dict) -> None:
         """
         Метод реализует обновление записи о фильме в базах данных.
@@ -90,6 +148,20 @@ class MovieService:
 
         self.dao.update(movie)
 
+    @transactional
+    def patch(self, mid: int, data: dict) -> bool:
+        """
+        Метод реализует частичное изменение записи о фильме: в базу данных записываются только переданные поля
+        одним запросом UPDATE, без предварительного чтения записи.
+
+        :param mid: id фильма в базе данных.
+        :param data: Новые значения изменяемых полей.
+        :return: True, если фильм есть в базе данных, иначе False.
+        :raises ValidationError: Если в данных есть неизвестные поля или значения неверного типа.
+        """
+        return self.dao.patch(mid, movie_patch_schema.load(data))
+
+    @transactional
     def delete(self, mid: int) -> None:
         """
         Метод реализует удаление записи о фильме в базе данных по id.
@@ -100,3 +172,50 @@ class MovieService:
         movie = self.get_one(mid)
 
         self.dao.delete(movie)
+
+    @transactional
+    def bulk_update(self, items: list) -> dict:
+        """
+        Метод реализует пакетное изменение фильмов в одной транзакции (см. MovieDAO.bulk_update).
+        Каждое изменение - словарь с id фильма и новыми значениями только изменяемых полей.
+        Некорректные изменения (неизвестные поля, неверные типы, нет id, повтор id) пропускаются.
+
+        :param items: Список изменений.
+        :return: Отчет: количество измененных фильмов, количество ошибок и результат по каждому изменению
+        (status: updated, not_found или invalid).
+        """
+        changes, results, seen = [], [], set()
+        for number, item in enumerate(items):
+            try:
+                change = movie_change_schema.load(item)
+            except ValidationError as e:
+                results.append({'index': number, 'status': 'invalid', 'errors': e.messages})
+                continue
+            if change.get('id') is None or change['id'] in seen:
+                results.append({'index': number, 'status': 'invalid', 'errors': {'id': ['Missing or duplicate id.']}})
+                continue
+            seen.add(change['id'])
+            changes.append(change)
+            results.append({'index': number, 'id': change['id']})
+
+        updated = self.dao.bulk_update(changes) if changes else set()
+        for result in results:
+            if 'status' not in result:
+                result['status'] = 'updated' if result['id'] in updated else 'not_found'
+        failed = sum(result['status'] != 'updated' for result in results)
+        return {'updated': len(updated), 'failed': failed, 'items': results}
+
+    @transactional
+    def bulk_delete(self, ids: list) -> dict:
+        """
+        Метод реализует пакетное удаление фильмов по id одним запросом в одной транзакции.
+
+        :param ids: Список id фильмов.
+        :return: Отчет: количество удаленных фильмов, количество ошибок и результат по каждому id
+        (status: deleted или not_found).
+        """
+        deleted = self.dao.bulk_delete(list(set(ids))) if ids else set()
+        results = [{'index': number, 'id': mid, 'status': 'deleted' if mid in deleted else 'not_found'}
+                   for number, mid in enumerate(ids)]
+        failed = sum(result['status'] != 'deleted' for result in results)
+        return {'deleted': len(deleted), 'failed': failed, 'items': results}
@@ -0,0 +1,91 @@
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import PWD_HASH_SALT, PWD_HASH_ITERATIONS
+
+
+def pbkdf2(password: str) -> bytes:
+    """
+    Функция вычисляет хеш пароля методом PBKDF2-SHA256 с использованием SALT и количеством иттераций 100000.
+    Выполняется в процессах пула PasswordHasher.
+
+    :param password: Пароль в виде строки.
+    :return: Хеш пароля.
+    """
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), PWD_HASH_SALT, PWD_HASH_ITERATIONS)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Исключение возникает, если очередь задач хеширования паролей заполнена.
+    """
+
+
+class PasswordHasher:
+    """
+    Класс описывает пул процессов для хеширования паролей.
+    Хеширование выполняется вне потока запроса и параллельно на всех ядрах процессора.
+    Количество одновременно выполняемых и ожидающих задач ограничено: при заполненной очереди
+    задача сразу отклоняется исключением PasswordHasherBusy, поэтому всплеск запросов
+    на авторизацию не занимает потоки, обслуживающие остальные запросы.
+
+    Процессы пула запускаются через forkserver, а не fork из потока запроса: иначе они наследовали бы
+    открытые дескрипторы процесса сервера (слушающий и клиентские сокеты, файлы базы данных SQLite).
+    Пул останавливается при выходе из процесса (atexit) или вызовом shutdown.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        """
+        Метод инициализирует параметры пула. Процессы создаются при первом хешировании.
+
+        :param workers: Количество процессов пула.
+        :param queue_limit: Максимальное количество одновременно выполняемых и ожидающих задач.
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Пул создается заново в каждом процессе, например, после fork воркеров сервера
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('forkserver'))
+                self._slots = threading.BoundedSemaphore(self.queue_limit)
+                self._pid = os.getpid()
+            return self._executor
+
+    def hash(self, password: str) -> bytes:
+        """
+        Метод вычисляет хеш пароля в пуле процессов.
+
+        :param password: Пароль в виде строки.
+        :return: Хеш пароля.
+        :raises PasswordHasherBusy: Если очередь задач заполнена.
+        """
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            return executor.submit(pbkdf2, password).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """
+        Метод останавливает процессы пула этого процесса, дождавшись выполнения начатых задач.
+        Пул, унаследованный через fork от родительского процесса, не останавливается: он принадлежит родителю.
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pid = None
@@ -0,0 +1,218 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+from dao.movie import MovieQuery
+from setup_db import use_primary
+
+# Значение вместо NULL в целочисленных колонках каталога (id в базе данных положительные)
+NO_ID = -1
+
+
+class Catalog:
+    """
+    Класс описывает неизменяемый каталог фильмов для расчета похожести: колонки таблицы movie в массивах NumPy,
+    упорядоченных по id. Изменение каталога создает новый объект (копирование массивов, O(n)),
+    поэтому расчет по уже полученному каталогу не требует блокировок.
+    """
+    columns = ('genre_id', 'director_id', 'year', 'rating')
+
+    def __init__(self, ids: np.ndarray, genre_ids: np.ndarray, director_ids: np.ndarray, years: np.ndarray,
+                 ratings: np.ndarray):
+        """
+        Метод инициализирует каталог готовыми массивами одинаковой длины.
+        :param ids: id фильмов (int64, по возрастанию).
+        :param genre_ids: id жанров (int32, NO_ID - нет жанра).
+        :param director_ids: id режиссеров (int32, NO_ID - нет режиссера).
+        :param years: Годы выпуска (float32, NaN - год неизвестен).
+        :param ratings: Рейтинги (float32, 0 - нет рейтинга).
+        """
+        self.ids = ids
+        self.genre_ids = genre_ids
+        self.director_ids = director_ids
+        self.years = years
+        self.ratings = ratings
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _values(movie) -> tuple:
+        return (
+            NO_ID if movie.genre_id is None else movie.genre_id,
+            NO_ID if movie.director_id is None else movie.director_id,
+            np.nan if movie.year is None else movie.year,
+            movie.rating or 0,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: list) -> 'Catalog':
+        """
+        Метод создает каталог по строкам таблицы movie.
+        :param rows: Строки с полями id и Catalog.columns, упорядоченные по id.
+        :return: Каталог.
+        """
+        values = [cls._values(row) for row in rows]
+        return cls(
+            np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((value[0] for value in values), dtype=np.int32, count=len(rows)),
+            np.fromiter((value[1] for value in values), dtype=np.int32, count=len(rows)),
+            np.fromiter((value[2] for value in values), dtype=np.float32, count=len(rows)),
+            np.fromiter((value[3] for value in values), dtype=np.float32, count=len(rows)),
+        )
+
+    def position(self, mid: int) -> Optional[int]:
+        """
+        Метод находит позицию фильма в каталоге бинарным поиском.
+        :param mid: id фильма.
+        :return: Позиция или None, если фильма нет в каталоге.
+        """
+        position = int(np.searchsorted(self.ids, mid))
+        if position < len(self.ids) and self.ids[position] == mid:
+            return position
+        return None
+
+    def replace(self, old_id: Optional[int], movie) -> 'Catalog':
+        """
+        Метод возвращает новый каталог без фильма old_id и с фильмом movie.
+        Если фильм movie уже есть в каталоге (например, каталог загружен после фиксации записи,
+        но до уведомления о ней), его значения заменяются, и фильм не добавляется второй раз.
+        :param old_id: id удаляемого или изменяемого фильма (None - фильм создан).
+        :param movie: Созданный или измененный фильм (None - фильм удален).
+        :return: Новый каталог.
+        """
+        arrays = [self.ids, self.genre_ids, self.director_ids, self.years, self.ratings]
+        if old_id is not None and (movie is None or movie.id != old_id):
+            position = self.position(old_id)
+            if position is not None:
+                arrays = [np.delete(array, position) for array in arrays]
+        if movie is not None:
+            position = int(np.searchsorted(arrays[0], movie.id))
+            values = (movie.id,) + self._values(movie)
+            if position < len(arrays[0]) and arrays[0][position] == movie.id:
+                arrays = [array.copy() for array in arrays]
+                for array, value in zip(arrays, values):
+                    array[position] = value
+            else:
+                arrays = [np.insert(array, position, value) for array, value in zip(arrays, values)]
+        return Catalog(*arrays)
+
+    def scores(self, position: int, weights: dict, year_scale: float) -> np.ndarray:
+        """
+        Метод рассчитывает похожесть всех фильмов каталога на фильм в позиции position одним проходом
+        по массивам (без цикла Python по фильмам):
+        weights['genre'] * (тот же жанр) + weights['director'] * (тот же режиссер)
+        + weights['year'] / (1 + |разница лет| / year_scale) + weights['rating'] * рейтинг / 10.
+        Неизвестные жанр, режиссер и год не добавляют похожести. Сам фильм получает оценку -inf.
+        :param position: Позиция фильма в каталоге.
+        :param weights: Веса составляющих похожести.
+        :param year_scale: Разница в годах, при которой близость по году уменьшается вдвое.
+        :return: Массив оценок (float32) в порядке каталога.
+        """
+        scores = self.ratings * np.float32(weights['rating'] / 10)
+        genre_id, director_id, year = self.genre_ids[position], self.director_ids[position], self.years[position]
+        if genre_id != NO_ID:
+            scores += (self.genre_ids == genre_id) * np.float32(weights['genre'])
+        if director_id != NO_ID:
+            scores += (self.director_ids == director_id) * np.float32(weights['director'])
+        if not np.isnan(year):
+            closeness = np.float32(weights['year']) / (1 + np.abs(self.years - year) / np.float32(year_scale))
+            scores += np.nan_to_num(closeness, copy=False, nan=0.0)
+        scores[position] = -np.inf
+        return scores
+
+    def top(self, position: int, limit: int, weights: dict, year_scale: float) -> list[tuple]:
+        """
+        Метод выбирает самые похожие фильмы частичной сортировкой (argpartition) за O(n + limit log limit).
+        :param position: Позиция фильма в каталоге.
+        :param limit: Количество фильмов.
+        :param weights: Веса составляющих похожести (см. scores).
+        :param year_scale: Масштаб близости по году (см. scores).
+        :return: Список пар (id, оценка) по убыванию оценки, при равной оценке - по возрастанию id.
+        """
+        limit = min(limit, len(self.ids) - 1)
+        if limit <= 0:
+            return []
+        scores = self.scores(position, weights, year_scale)
+        candidates = np.argpartition(-scores, limit - 1)[:limit]
+        ordered = candidates[np.lexsort((self.ids[candidates], -scores[candidates]))]
+        return [(int(self.ids[i]), float(scores[i])) for i in ordered]
+
+
+class SimilarService:
+    """
+    Класс описывает сервис рекомендаций похожих фильмов. Похожесть рассчитывается векторно по каталогу
+    фильмов в памяти процесса (Catalog), без запросов к базе данных; из базы данных читаются только
+    найденные фильмы.
+
+    Каталог загружается из MovieDAO при первом обращении (см. build) и обновляется по уведомлениям CachedDAO
+    о записи в этом процессе. Версия каталога сдвигается только на следующую по порядку версию данных,
+    иначе (запись в другом процессе, массовая загрузка) каталог загружается заново при следующем запросе.
+    """
+
+    def __init__(self, dao, weights: dict, year_scale: float):
+        """
+        Метод инициализирует сервис и подписывается на запись через кеширующий DAO фильмов.
+        :param dao: Кеширующий DAO фильмов (CachedDAO над MovieDAO).
+        :param weights: Веса составляющих похожести: genre, director, year, rating (см. Catalog.scores).
+        :param year_scale: Масштаб близости по году в годах.
+        """
+        self.dao = dao
+        self.weights = weights
+        self.year_scale = year_scale
+        self.catalog = None
+        self.version = None
+        self._lock = threading.Lock()
+        dao.subscribe(self._on_write)
+
+    def build(self) -> None:
+        """
+        Метод загружает каталог заново по данным основной базы данных.
+        """
+        with self._lock:
+            self._build()
+
+    def _build(self) -> None:
+        # Версия читается до данных: запись между ними приведет к повторной загрузке, а не к потере изменений
+        version = self.dao.version()
+        with use_primary(self.dao.session):
+            rows = self.dao.get_columns(Catalog.columns)
+        self.catalog = Catalog.from_rows(rows)
+        self.version = version
+
+    def _get_catalog(self) -> Catalog:
+        with self._lock:
+            if self.version is None or self.version[:2] != self.dao.version()[:2]:
+                self._build()
+            return self.catalog
+
+    def similar(self, mid: int, limit: int) -> Optional[list[tuple]]:
+        """
+        Метод возвращает фильмы, похожие на фильм mid.
+        :param mid: id фильма.
+        :param limit: Количество фильмов.
+        :return: Список пар (фильм с полями MovieQuery.selectable, оценка похожести) по убыванию оценки
+        или None, если фильма нет.
+        """
+        catalog = self._get_catalog()
+        position = catalog.position(mid)
+        if position is None:
+            return None
+        found = catalog.top(position, limit, self.weights, self.year_scale)
+        if not found:
+            return []
+        movie_query = MovieQuery().any_of('id', [pk for pk, _ in found]).select(*MovieQuery.selectable)
+        movies = {movie.id: movie for movie in self.dao.get_filtered(movie_query)}
+        return [(movies[pk], score) for pk, score in found if pk in movies]
+
+    def _on_write(self, old_id: Optional[int], entity, version: tuple) -> None:
+        with self._lock:
+            current = self.version
+            contiguous = current is not None and current[0] == version[0] and current[1] + 1 == version[1]
+            if not contiguous or (old_id is None and entity is None):
+                self.catalog = None
+                self.version = None
+                return
+            self.catalog = self.catalog.replace(old_id, entity)
+            self.version = version
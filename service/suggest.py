@@ -0,0 +1,200 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Optional
+
+from setup_db import use_primary
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """
+    Функция приводит текст к виду для сравнения без учета регистра и различий е/ё.
+    :param text: Текст.
+    :return: Нормализованный текст.
+    """
+    return text.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """
+    Класс описывает индекс для поиска записей по префиксу слова в тексте (название фильма, имя режиссера).
+    Ключ индекса - часть нормализованного текста, начиная с каждого из первых max_words слов,
+    обрезанная до max_key_length символов. Ключи хранятся в отсортированном списке,
+    поиск выполняется бинарным поиском (bisect) за O(log n + limit).
+    Объем памяти ограничен: не более max_words ключей по max_key_length символов на запись.
+    """
+
+    def __init__(self, max_words: int, max_key_length: int):
+        """
+        Метод инициализирует пустой индекс.
+        :param max_words: Максимальное количество индексируемых слов текста.
+        :param max_key_length: Максимальная длина ключа в символах.
+        """
+        self.max_words = max_words
+        self.max_key_length = max_key_length
+        self.keys = []
+        self.ids = array('q')
+        self.texts = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _keys(self, text: str) -> list[str]:
+        text = normalize(text)
+        words = islice(WORD_PATTERN.finditer(text), self.max_words)
+        return list(dict.fromkeys(text[word.start():word.start() + self.max_key_length] for word in words))
+
+    def load(self, items) -> None:
+        """
+        Метод заполняет пустой индекс записями одной сортировкой (быстрее, чем добавление по одной записи).
+        :param items: Итерируемый объект пар (id, текст).
+        """
+        pairs = []
+        for pk, text in items:
+            if text:
+                self.texts[pk] = text
+                pairs.extend((key, pk) for key in self._keys(text))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = array('q', [pk for _, pk in pairs])
+
+    def add(self, pk: int, text: Optional[str]) -> None:
+        """
+        Метод добавляет запись в индекс (запись с тем же id предварительно удаляется).
+        :param pk: id записи.
+        :param text: Текст записи.
+        """
+        self.remove(pk)
+        if not text:
+            return
+        self.texts[pk] = text
+        for key in self._keys(text):
+            position = bisect_left(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, pk)
+
+    def remove(self, pk: int) -> None:
+        """
+        Метод удаляет запись из индекса.
+        :param pk: id записи.
+        """
+        text = self.texts.pop(pk, None)
+        if text is None:
+            return
+        for key in self._keys(text):
+            position = bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.ids[position] == pk:
+                    del self.keys[position]
+                    del self.ids[position]
+                    break
+                position += 1
+
+    def search(self, prefix: str, limit: int) -> list[tuple]:
+        """
+        Метод находит записи, в тексте которых есть слово, начинающееся с prefix.
+        Записи упорядочены по алфавиту найденной части текста.
+        :param prefix: Префикс.
+        :param limit: Максимальное количество записей.
+        :return: Список пар (id, текст).
+        """
+        prefix = normalize(prefix)
+        key_prefix = prefix[:self.max_key_length]
+        found = {}
+        position = bisect_left(self.keys, key_prefix)
+        while position < len(self.keys) and len(found) < limit and self.keys[position].startswith(key_prefix):
+            pk = self.ids[position]
+            text = self.texts[pk]
+            if len(prefix) <= self.max_key_length or prefix in normalize(text):
+                found.setdefault(pk, text)
+            position += 1
+        return list(found.items())
+
+
+class SuggestService:
+    """
+    Класс описывает сервис подсказок при вводе (автодополнения) по названиям фильмов, именам режиссеров
+    и названиям жанров. Подсказки выдаются из индексов PrefixIndex в памяти процесса, без запросов к базе данных.
+
+    Индекс строится при первом обращении (или при запуске приложения, см. build_all) и обновляется
+    по уведомлениям CachedDAO о записи в этом процессе. Версия индекса сдвигается только на следующую
+    по порядку версию данных; если версия данных изменилась иначе (запись в другом процессе сервера,
+    массовая загрузка), индекс перестраивается при следующем запросе.
+    """
+
+    def __init__(self, sources: dict, max_words: int, max_key_length: int):
+        """
+        Метод инициализирует сервис и подписывается на запись через кеширующие DAO.
+        :param sources: Словарь {тип подсказки: (кеширующий DAO, название поля с текстом)}.
+        :param max_words: Максимальное количество индексируемых слов текста (см. PrefixIndex).
+        :param max_key_length: Максимальная длина ключа индекса в символах (см. PrefixIndex).
+        """
+        self.sources = sources
+        self.max_words = max_words
+        self.max_key_length = max_key_length
+        self.indexes = {}
+        self.versions = {}
+        self._lock = threading.Lock()
+        for kind, (dao, _) in sources.items():
+            dao.subscribe(lambda old_id, entity, version, kind=kind: self._on_write(kind, old_id, entity, version))
+
+    def build(self, kind: str) -> None:
+        """
+        Метод строит индекс подсказок заново по данным основной базы данных.
+        :param kind: Тип подсказки.
+        """
+        dao, field = self.sources[kind]
+        # Версия читается до данных: запись между ними приведет к повторному построению, а не к потере изменений
+        version = dao.version()
+        index = PrefixIndex(self.max_words, self.max_key_length)
+        with use_primary(dao.session):
+            rows = dao.get_columns((field,))
+        index.load((row.id, getattr(row, field)) for row in rows)
+        self.indexes[kind] = index
+        self.versions[kind] = version
+
+    def build_all(self) -> None:
+        """
+        Метод строит индексы подсказок всех типов.
+        """
+        with self._lock:
+            for kind in self.sources:
+                self.build(kind)
+
+    def suggest(self, kind: str, prefix: str, limit: int) -> list[dict]:
+        """
+        Метод возвращает подсказки для введенного префикса.
+        :param kind: Тип подсказки: movie, director или genre.
+        :param prefix: Введенный префикс.
+        :param limit: Максимальное количество подсказок.
+        :return: Список словарей с id записи и текстом (поле с названием из sources).
+        :raises ValueError: Если тип подсказки не поддерживается.
+        """
+        if kind not in self.sources:
+            raise ValueError(f'Unknown suggest kind: {kind}')
+        dao, field = self.sources[kind]
+        with self._lock:
+            version = self.versions.get(kind)
+            if version is None or version[:2] != dao.version()[:2]:
+                self.build(kind)
+            found = self.indexes[kind].search(prefix, limit)
+        return [{'id': pk, field: text} for pk, text in found]
+
+    def _on_write(self, kind: str, old_id: Optional[int], entity, version: tuple) -> None:
+        with self._lock:
+            current = self.versions.get(kind)
+            contiguous = current is not None and current[0] == version[0] and current[1] + 1 == version[1]
+            if not contiguous or (old_id is None and entity is None):
+                self.versions.pop(kind, None)
+                return
+            index = self.indexes[kind]
+            if old_id is not None:
+                index.remove(old_id)
+            if entity is not None:
+                _, field = self.sources[kind]
+                index.add(entity.id, getattr(entity, field))
+            self.versions[kind] = version
@@ -0,0 +1,61 @@
+import functools
+
+from setup_db import AFTER_COMMIT
+
+
+class UnitOfWork:
+    """
+    Класс описывает единицу работы: все записи DAO внутри нее (DAO выполняют только flush)
+    фиксируются одной транзакцией с одним commit при выходе из внешнего блока with.
+    При исключении транзакция откатывается целиком, поэтому запись нескольких таблиц атомарна.
+    Вложенные блоки with (например, метод сервиса, вызывающий другой метод сервиса) присоединяются
+    к внешней единице работы. Действия, отложенные функцией setup_db.after_commit (очистка кеша,
+    уведомление подписчиков), выполняются после фиксации транзакции.
+    """
+
+    def __init__(self, session):
+        """
+        Метод инициализирует единицу работы.
+        :param session: Сессия SQLAlchemy (в том числе scoped_session).
+        """
+        self.session = session
+
+    def __enter__(self) -> 'UnitOfWork':
+        info = self.session.info
+        if info.get(AFTER_COMMIT) is None:
+            info[AFTER_COMMIT] = []
+            info['unit_of_work_depth'] = 0
+        info['unit_of_work_depth'] += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        info = self.session.info
+        info['unit_of_work_depth'] -= 1
+        if info['unit_of_work_depth'] > 0:
+            return False
+        pending = info.pop(AFTER_COMMIT)
+        if exc_type is not None:
+            self.session.rollback()
+            return False
+        try:
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        for callback in pending:
+            callback()
+        return False
+
+
+def transactional(method):
+    """
+    Декоратор выполняет метод сервиса в единице работы (UnitOfWork) над сессией DAO сервиса (self.dao.session).
+    :param method: Метод сервиса.
+    :return: Обернутый метод.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with UnitOfWork(self.dao.session):
+            return method(self, *args, **kwargs)
+
+    return wrapper
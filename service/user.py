@@ -1,9 +1,14 @@
 import base64
-import hashlib
 import hmac
+from typing import Optional
 
-from constants import PWD_HASH_SALT, PWD_HASH_ITERATIONS
+from dao.model.user import UserSchema
 from dao.user import UserDAO
+from service.password import PasswordHasher
+from service.unit_of_work import transactional
+
+# Проверка данных частичного изменения пользователя: id пользователя задается в адресе запроса
+user_patch_schema = UserSchema(exclude=('id',), partial=True)
 
 
 class UserService:
@@ -11,13 +16,15 @@ class UserService:
     Класс описывает сервисы для работы в приложении Flask с таблицей фильмов.
     """
 
-    def __init__(self, dao: UserDAO):
+    def __init__(self, dao: UserDAO, hasher: PasswordHasher):
         """
-        Метод инициализирует DAO
+        Метод инициализирует DAO и пул процессов для хеширования паролей
 
         :param dao: DAO объект
+        :param hasher: Пул процессов для хеширования паролей
         """
         self.dao = dao
+        self.hasher = hasher
 
     def get_all(self) -> list:
         """
@@ -49,6 +56,18 @@ class UserService:
         """
         return self.dao.get_by_username(username)
 
+    def get_page(self, after: Optional[list], limit: int) -> list:
+        """
+        Метод реализует постраничное получение записей о пользователей из базы данных.
+
+
+        :param after: Ключ последней записи предыдущей страницы (None - первая страница).
+        :param limit: Максимальное количество записей на странице.
+        :return: Ответ базы данных на запрос получения страницы записей.
+        """
+        return self.dao.get_page(after, limit)
+
+    @transactional
     def create(self, data: dict) -> list:
         """
         Метод реализует запись новых данных в базу данных.
@@ -57,6 +76,7 @@ class UserService:
         """
         return self.dao.create(data)
 
+    @transactional
     def delete(self, uid: int) -> None:
         """
         Метод реализует удаление записи о пользователе в базе данных.
@@ -66,49 +86,58 @@ class UserService:
         user = self.get_one(uid)
         self.dao.delete(user)
 
-    def update(self, data: dict) -> None:
+    @transactional
+    def update(self, uid: int, data: dict) -> None:
         """
         Метод реализует обновление записи о пользователе в базе данных.
 
-        :param data:
+        :param uid: id пользователя в базе данных.
+        :param data: Данные о пользователе, которые нужно записать в базу данных.
         :return:
         """
-        user = self.get_one(data.get("id"))
+        user = self.get_one(uid)
         user.username = data.get("username")
         user.password = data.get("password")
         user.role = data.get("role")
 
         self.dao.update(user)
 
+    @transactional
+    def patch(self, uid: int, data: dict) -> bool:
+        """
+        Метод реализует частичное изменение записи о пользователе: в базу данных записываются только переданные поля
+        одним запросом UPDATE, без предварительного чтения записи. Новый пароль сохраняется в виде хеша.
+
+        :param uid: id пользователя в базе данных.
+        :param data: Новые значения изменяемых полей.
+        :return: True, если пользователь есть в базе данных, иначе False.
+        :raises ValidationError: Если в данных есть неизвестные поля или значения неверного типа.
+        :raises PasswordHasherBusy: Если очередь задач хеширования заполнена.
+        """
+        data = user_patch_schema.load(data)
+        if 'password' in data:
+            data['password'] = self.make_user_password_hash(data['password'])
+        return self.dao.patch(uid, data)
+
     def make_user_password_hash(self, password: str):
         """
         Метод производит генерацию хеша из передаваемого пароля. Кодируется методом SHA256,
-        с использованием SALT и количеством иттераций 100000.
+        с использованием SALT и количеством иттераций 100000. Хеширование выполняется в пуле процессов.
 
         :param password: Пароль в виде строки.
         :return: Сгенерированный хэш-пароль
+        :raises PasswordHasherBusy: Если очередь задач хеширования заполнена.
         """
-        return base64.b64encode(hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            PWD_HASH_SALT,
-            PWD_HASH_ITERATIONS
-        ))
+        return base64.b64encode(self.hasher.hash(password))
 
     def compare_password(self, password_hash, other_password: str) -> bool:
         """
         Функция производит сравнивание двух паролей, переводит пароль, введенный пользователем в хэш
-        и сравнивает с имеющимся.
+        и сравнивает с имеющимся. Хеширование выполняется в пуле процессов.
 
         :param password_hash: Хеш-пароль.
         :param other_password: Пароль в открытом виде.
         :return: True или False
+        :raises PasswordHasherBusy: Если очередь задач хеширования заполнена.
         """
-        return hmac.compare_digest(
-            base64.b64decode(password_hash),
-            hashlib.pbkdf2_hmac(
-                'sha256',
-                other_password.encode('utf-8'),
-                PWD_HASH_SALT,
-                PWD_HASH_ITERATIONS
-            ))
+        return hmac.compare_digest(base64.b64decode(password_hash), self.hasher.hash(other_password))
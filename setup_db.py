@@ -1,3 +1,105 @@
-from flask_sqlalchemy import SQLAlchemy
+from contextlib import contextmanager
 
-db = SQLAlchemy()
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import event, orm
+from sqlalchemy.sql import Select
+
+REPLICA_BIND = 'replica'
+# Ключ session.info со списком действий после фиксации транзакции единицы работы (см. service.unit_of_work)
+AFTER_COMMIT = 'after_commit'
+
+
+class RoutingSession(SignallingSession):
+    """
+    Класс описывает сессию, которая направляет чтение в реплику (bind replica из SQLALCHEMY_BINDS),
+    а запись - в основную базу данных.
+    В основную базу данных направляются:
+    - запись (INSERT, UPDATE, DELETE и сохранение изменений объектов);
+    - все запросы сессии, в которой установлен флаг info['primary'] (см. use_primary).
+    Если реплика не настроена, все запросы выполняются в основной базе данных.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if isinstance(clause, Select) and not self._flushing and not self.info.get('primary'):
+            binds = self.app.config.get('SQLALCHEMY_BINDS') or {}
+            if REPLICA_BIND in binds:
+                return get_state(self.app).db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """
+    Класс описывает расширение Flask-SQLAlchemy с сессией RoutingSession.
+    """
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+db = RoutingSQLAlchemy()
+
+
+@contextmanager
+def use_primary(session):
+    """
+    Контекстный менеджер направляет все запросы сессии в основную базу данных.
+    :param session: Сессия SQLAlchemy (в том числе scoped_session).
+    """
+    previous = session.info.get('primary', False)
+    session.info['primary'] = True
+    try:
+        yield session
+    finally:
+        session.info['primary'] = previous
+
+
+def after_commit(session, callback) -> None:
+    """
+    Функция откладывает вызов callback до фиксации транзакции текущей единицы работы (UnitOfWork).
+    Используется для действий, которые должны видеть только зафиксированные данные: очистка кеша,
+    уведомление подписчиков. При откате транзакции действие не выполняется.
+    :param session: Сессия SQLAlchemy (в том числе scoped_session).
+    :param callback: Функция без аргументов.
+    :raises RuntimeError: Если запись выполняется вне единицы работы.
+    """
+    pending = session.info.get(AFTER_COMMIT)
+    if pending is None:
+        raise RuntimeError('Database write outside of a unit of work')
+    pending.append(callback)
+
+
+def listen_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """
+    Функция регистрирует выполнение PRAGMA при открытии каждого соединения engine с SQLite.
+    Для асинхронного engine (AsyncEngine) передается его синхронная часть engine.sync_engine.
+    :param engine: Engine SQLAlchemy.
+    :param pragmas: Словарь {название PRAGMA: значение}.
+    :return: None
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    event.listen(engine, 'connect', set_pragmas)
+
+
+def register_sqlite_pragmas(app: Flask) -> None:
+    """
+    Функция регистрирует выполнение PRAGMA из настройки SQLITE_PRAGMAS при открытии каждого соединения с SQLite
+    (основная база данных и базы из SQLALCHEMY_BINDS). Вызывается до первого обращения к базе данных.
+    :param app: Сконфигурированное Flask-приложение.
+    :return: None
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    with app.app_context():
+        for bind in [None] + list(app.config.get('SQLALCHEMY_BINDS') or {}):
+            listen_sqlite_pragmas(db.get_engine(app, bind=bind), pragmas)
@@ -2,6 +2,7 @@ from flask import request, abort
 from flask_restx import Namespace, Resource
 
 from implemented import auth_service
+from service.password import PasswordHasherBusy
 
 auth_ns = Namespace('auth')
 
@@ -11,6 +12,7 @@ class AuthsView(Resource):
     """
     Класс CBV для представления auth. Реализованы методы POST и PUT.
     POST-метод: производит генерацию access и refresh tokens на основе запроса пользователя.
+    Если очередь задач хеширования паролей заполнена, возвращает HTTP-код 503.
     PUT-метод: производит генерацию access и refresh tokens на основе refresh token, передаваемого в запросе
     """
     def post(self):
@@ -21,7 +23,10 @@ class AuthsView(Resource):
         if None in [username, password]:
             abort(401)
 
-        tokens = auth_service.generate_token(username, password)
+        try:
+            tokens = auth_service.generate_token(username, password)
+        except PasswordHasherBusy:
+            return '', 503, {'Retry-After': '1'}
 
         return tokens, 201
 
@@ -0,0 +1,27 @@
+from flask_restx import Namespace, Resource
+
+from helpers import admin_required
+from implemented import director_dao, genre_dao, movie_dao
+
+cache_ns = Namespace('cache')
+
+
+@cache_ns.route('/')
+class CacheView(Resource):
+    """
+    Class-Based View для отображения статистики кеша.
+    Реализовано:
+    - отображение количества попаданий, промахов и записей в кеше каждой таблицы GET-запросом на /cache.
+    """
+
+    @admin_required
+    def get(self) -> tuple:
+        """
+        Метод реализует отправку GET-запроса на /cache.
+        :return: Статистика кеша в формате JSON и HTTP-код 200.
+        """
+        return {
+            'director': director_dao.cache.stats(),
+            'genre': genre_dao.cache.stats(),
+            'movie': movie_dao.cache.stats(),
+        }, 200
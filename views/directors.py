@@ -1,14 +1,16 @@
 from flask import request
 from flask_restx import Namespace, Resource
 
-from helpers import auth_required, admin_required
-from implemented import director_service
+from helpers import auth_required, admin_required, conditional_get, get_fields_param, get_page_params, make_page
+from implemented import director_service, director_dao
 from dao.model.director import DirectorSchema
+from dao.model.serializer import compile_schema, compile_partial_schema
 
 director_ns = Namespace('directors')
 
-director_schema = DirectorSchema()
-directors_schema = DirectorSchema(many=True)
+director_schema = compile_schema(DirectorSchema())
+directors_schema = compile_schema(DirectorSchema(many=True))
+director_fields = tuple(director_schema.schema.dump_fields)
 
 
 @director_ns.route('/')
@@ -21,11 +23,28 @@ class DirectorsView(Resource):
     """
 
     @auth_required
+    @conditional_get(director_dao)
     def get(self) -> tuple:
         """
         Метод реализует отправку GET-запроса на /directors.
+        Поддерживается постраничный вывод с использованием квери-параметров limit, after_id и cursor
+        и выбор возвращаемых полей с использованием квери-параметра fields=id,name.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         """
+        fields = get_fields_param(director_fields)
+        page_params = get_page_params()
+        if fields:
+            schema = compile_partial_schema(DirectorSchema, fields, many=True)
+            if page_params is not None:
+                after, limit = page_params
+                return make_page(director_service.get_columns(fields, after, limit + 1), limit, schema), 200
+            return schema.dump(director_service.get_columns(fields)), 200
+
+        if page_params is not None:
+            after, limit = page_params
+            page = director_service.get_page(after, limit + 1)
+            return make_page(page, limit, directors_schema), 200
+
         all_directors = director_service.get_all()
         return directors_schema.dump(all_directors), 200
 
@@ -53,17 +72,21 @@ class DirectorView(Resource):
     """
 
     @auth_required
+    @conditional_get(director_dao)
     def get(self, did):
         """
         Метод реализует отправку GET-запроса на /directors/id.
+        Квери-параметр fields=id,name ограничивает возвращаемые поля.
         :param did: id режиссера, информацию о котором нужно вытащить из БД.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         В случае, если id нет в базе данных - пустая строка и HTTP-код 404.
         """
+        fields = get_fields_param(director_fields)
         director_by_id = director_service.get_one(did)
         if director_by_id is None:
             return '', 404
-        return director_schema.dump(director_by_id), 200
+        schema = compile_partial_schema(DirectorSchema, fields) if fields else director_schema
+        return schema.dump(director_by_id), 200
 
     @admin_required
     def put(self, did: int) -> tuple:
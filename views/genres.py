@@ -1,14 +1,16 @@
 from flask import request
 from flask_restx import Namespace, Resource
 
-from helpers import auth_required, admin_required
+from helpers import auth_required, admin_required, conditional_get, get_fields_param, get_page_params, make_page
 from dao.model.genre import GenreSchema
-from implemented import genre_service
+from dao.model.serializer import compile_schema, compile_partial_schema
+from implemented import genre_service, genre_dao
 
 genre_ns = Namespace('genres')
 
-genre_schema = GenreSchema()
-genres_schema = GenreSchema(many=True)
+genre_schema = compile_schema(GenreSchema())
+genres_schema = compile_schema(GenreSchema(many=True))
+genre_fields = tuple(genre_schema.schema.dump_fields)
 
 
 @genre_ns.route('/')
@@ -21,11 +23,28 @@ class GenresView(Resource):
     """
 
     @auth_required
+    @conditional_get(genre_dao)
     def get(self) -> tuple:
         """
         Метод реализует отправку GET-запроса на /genres.
+        Поддерживается постраничный вывод с использованием квери-параметров limit, after_id и cursor
+        и выбор возвращаемых полей с использованием квери-параметра fields=id,name.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         """
+        fields = get_fields_param(genre_fields)
+        page_params = get_page_params()
+        if fields:
+            schema = compile_partial_schema(GenreSchema, fields, many=True)
+            if page_params is not None:
+                after, limit = page_params
+                return make_page(genre_service.get_columns(fields, after, limit + 1), limit, schema), 200
+            return schema.dump(genre_service.get_columns(fields)), 200
+
+        if page_params is not None:
+            after, limit = page_params
+            page = genre_service.get_page(after, limit + 1)
+            return make_page(page, limit, genres_schema), 200
+
         all_directors = genre_service.get_all()
         return genres_schema.dump(all_directors), 200
 
@@ -53,17 +72,21 @@ class GenreView(Resource):
     """
 
     @auth_required
+    @conditional_get(genre_dao)
     def get(self, gid):
         """
         Метод реализует отправку GET-запроса на /genres/id.
+        Квери-параметр fields=id,name ограничивает возвращаемые поля.
         :param gid: id жанра, информацию о котором нужно вытащить из БД.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         В случае, если id нет в базе данных - пустая строка и HTTP-код 404.
         """
+        fields = get_fields_param(genre_fields)
         genre_by_id = genre_service.get_one(gid)
         if genre_by_id is None:
             return '', 404
-        return genre_schema.dump(genre_by_id), 200
+        schema = compile_partial_schema(GenreSchema, fields) if fields else genre_schema
+        return schema.dump(genre_by_id), 200
 
     @admin_required
     def put(self, gid: int) -> tuple:
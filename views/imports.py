@@ -0,0 +1,34 @@
+from flask import request
+from flask_restx import Namespace, Resource
+
+from helpers import admin_required
+from implemented import import_service
+from service.imports import Utf8Lines, detect_format
+
+import_ns = Namespace('import')
+
+
+@import_ns.route('/<kind>')
+class ImportView(Resource):
+    """
+    Class-Based View для массовой загрузки данных.
+    Реализовано:
+    - загрузка фильмов, режиссеров или жанров из тела POST-запроса на /import/movies, /import/directors
+    и /import/genres в формате JSON Lines (по умолчанию) или CSV (заголовок Content-Type: text/csv).
+    """
+
+    @admin_required
+    def post(self, kind: str) -> tuple:
+        """
+        Метод реализует отправку POST-запроса на /import/kind.
+        Тело запроса читается построчно, без загрузки файла в память целиком.
+        :param kind: Название таблицы: movies, directors или genres.
+        :return: Отчет о загрузке в формате JSON и HTTP-код 201.
+        В случае неизвестной таблицы - пустая строка и HTTP-код 404.
+        """
+        if kind not in import_service.targets:
+            return '', 404
+
+        lines = Utf8Lines(request.stream)
+        report = import_service.import_lines(kind, lines, detect_format(request.content_type or ''))
+        return report, 201
@@ -1,14 +1,97 @@
-from flask import request
+import json
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+from flask import Response, request, abort, stream_with_context
 from flask_restx import Namespace, Resource
+from marshmallow import ValidationError
 
-from helpers import auth_required, admin_required
-from implemented import movie_service
+from constants import (BATCH_MAX_ITEMS, LEADERBOARD_SIZE, PAGE_DEFAULT_LIMIT, SIMILAR_DEFAULT_LIMIT, SIMILAR_MAX_LIMIT,
+                       STREAM_CHUNK_SIZE)
+from helpers import auth_required, admin_required, conditional_get, get_fields_param, get_page_params, make_page
+from implemented import movie_service, movie_dao, director_dao, genre_dao, similar_service
 from dao.model.movie import MovieSchema
+from dao.model.serializer import FastSchema, compile_schema, compile_partial_schema
+from dao.movie import MovieQuery
 
 movie_ns = Namespace('movies')
 
-movie_schema = MovieSchema()
-movies_schema = MovieSchema(many=True)
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def parse_expand() -> tuple:
+    """
+    Функция разбирает квери-параметр expand - список связей фильма через запятую (expand=director,genre),
+    которые загружаются одним запросом и сериализуются вложенными объектами.
+    При неизвестных связях возвращает HTTP-код 400.
+    :return: Кортеж названий связей.
+    """
+    expand = tuple(filter(None, request.args.get('expand', '').split(',')))
+    if any(relation not in MovieQuery.relations for relation in expand):
+        abort(400)
+    return expand
+
+
+@lru_cache
+def get_movie_schema(expand: tuple, many: bool = False, only: tuple = ()) -> FastSchema:
+    """
+    Функция возвращает скомпилированный сериализатор фильма с вложенными объектами для связей из expand.
+    :param expand: Кортеж названий связей.
+    :param many: Сериализация списка фильмов.
+    :param only: Кортеж сериализуемых полей (по умолчанию - все поля).
+    :return: Быстрый сериализатор, совместимый с MovieSchema.
+    """
+    if only:
+        return compile_partial_schema(MovieSchema, only, many)
+    exclude = [relation for relation in MovieQuery.relations if relation not in expand]
+    return compile_schema(MovieSchema(many=many, exclude=exclude))
+
+
+def stream_ndjson(movies: Iterable, schema: FastSchema) -> Iterator[str]:
+    """
+    Функция-генератор сериализует фильмы по одному в строки JSON (NDJSON).
+    Строки отдаются клиенту частями по STREAM_CHUNK_SIZE фильмов.
+    :param movies: Итератор записей о фильмах.
+    :param schema: Сериализатор одного фильма.
+    :return: Итератор частей ответа.
+    """
+    chunk = []
+    for movie in movies:
+        chunk.append(json.dumps(schema.dump(movie), ensure_ascii=False))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def parse_movie_query() -> MovieQuery:
+    """
+    Функция формирует построитель запроса к таблице фильмов из квери-параметров:
+    - director_id, genre_id, year - равенство или вхождение в список значений через запятую (genre_id=1,4);
+    - year_from, year_to, rating_from, rating_to - границы диапазона (включительно);
+    - sort - поля сортировки через запятую, знак "-" означает сортировку по убыванию (sort=-rating,year);
+    - expand - связи, загружаемые тем же запросом (см. parse_expand);
+    - fields - поля, выбираемые из базы данных и возвращаемые клиенту (fields=id,title,year), без expand.
+    При некорректных значениях возвращает HTTP-код 400.
+    :return: Построитель запроса к таблице фильмов.
+    """
+    args = request.args
+    movie_query = MovieQuery().expand(*parse_expand())
+    try:
+        movie_query.select(*get_fields_param(MovieQuery.selectable))
+        for field in ('director_id', 'genre_id', 'year'):
+            if args.get(field):
+                movie_query.any_of(field, [int(value) for value in args[field].split(',')])
+        for field, cast in (('year', int), ('rating', float)):
+            low, high = args.get(f'{field}_from'), args.get(f'{field}_to')
+            if low or high:
+                movie_query.between(field, cast(low) if low else None, cast(high) if high else None)
+        for field in filter(None, args.get('sort', '').split(',')):
+            movie_query.sort(field.lstrip('-'), descending=field.startswith('-'))
+    except ValueError:
+        abort(400)
+    return movie_query
 
 
 @movie_ns.route('/')
@@ -17,47 +100,55 @@ class MoviesView(Resource):
     Class-Based View для отображения фильмов.
     Реализовано:
     - отображение всех фильмов GET-запросом на /movies;
-    - отображение фильмов отфильтрованных по конкретному режиссеру
-    (GET-запросом на /movies с использованием квери-параметра director_id);
-    - отображение фильмов отфильтрованных по конкретному жанру
-    (GET-запросом на /movies с использованием квери-параметра genre_id);
-    - отображение фильмов отфильтрованных по конкретному году выпуска
-    (GET-запросом на /movies с использованием квери-параметра year);
-    - добавление нового фильма в базу данных POST-запросом на /movies.
+    - отображение фильмов, отфильтрованных по любому набору условий
+    (GET-запросом на /movies с использованием квери-параметров, см. parse_movie_query);
+    - постраничный вывод с использованием квери-параметров limit, after_id и cursor;
+    - потоковый вывод в формате NDJSON (заголовок Accept: application/x-ndjson);
+    - добавление нового фильма в базу данных POST-запросом на /movies;
+    - пакетное изменение фильмов PATCH-запросом на /movies;
+    - пакетное удаление фильмов DELETE-запросом на /movies.
     """
 
     @auth_required
+    @conditional_get(movie_dao, director_dao, genre_dao)
     def get(self) -> tuple:
         """
         Метод реализует отправку GET-запросов на /movies.
         Возможные варианты исполнения:
         - отображение всех фильмов GET-запросом на /movies;
-        - отображение фильмов отфильтрованных по конкретному режиссеру
-        (GET-запросом на /movies с использованием квери-параметра director_id);
-        - отображение фильмов отфильтрованных по конкретному жанру
-        (GET-запросом на /movies с использованием квери-параметра genre_id);
-        - отображение фильмов отфильтрованных по конкретному году выпуска
-        (GET-запросом на /movies с использованием квери-параметра year);
+        - отображение фильмов, отфильтрованных по режиссеру, жанру, году выпуска и рейтингу
+        и отсортированных в заданном порядке (квери-параметры director_id, genre_id, year,
+        year_from, year_to, rating_from, rating_to и sort), все условия применяются совместно;
+        - постраничный вывод с использованием квери-параметров limit, after_id и cursor;
+        - вложенные данные о режиссере и жанре с использованием квери-параметра expand=director,genre;
+        - выбор возвращаемых полей с использованием квери-параметра fields=id,title,year;
+        - потоковый вывод по одному фильму в строке (NDJSON) при заголовке Accept: application/x-ndjson;
         :return: Сериализованные данные в формате JSON, в зависимости от реализации запроса и HTTP-код 200
         """
-        director_id = request.args.get('director_id')
-        genre_id = request.args.get('genre_id')
-        year = request.args.get('year')
-        # Фильтрация по режиссеру
-        if director_id:
-            movies_with_director = movie_service.get_all_on_director(director_id)
-            return movies_schema.dump(movies_with_director), 200
-        # Фильтрация только по жанру
-        elif genre_id:
-            movies_with_genre = movie_service.get_all_on_genre(genre_id)
-            return movies_schema.dump(movies_with_genre), 200
-        # Фильтрация по году выпуска
-        elif year:
-            movies_by_year = movie_service.get_all_by_year(year)
-            return movies_schema.dump(movies_by_year), 200
+        movie_query = parse_movie_query()
+        expand, only = tuple(movie_query.expanded), tuple(movie_query.selected)
+        schema = get_movie_schema(expand, many=True, only=only)
+        # Постраничный вывод
+        page_params = get_page_params(len(movie_query.sort_keys()))
+        if page_params is not None:
+            after, limit = page_params
+            try:
+                page = movie_service.get_page(after, limit + 1, movie_query)
+            except ValueError:
+                abort(400)
+            return make_page(page, limit, schema, key=movie_query.key), 200
+        # Потоковый вывод в формате NDJSON
+        if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+            movies = movie_service.iter_filtered(movie_query)
+            item_schema = get_movie_schema(expand, only=only)
+            return Response(stream_with_context(stream_ndjson(movies, item_schema)), mimetype=NDJSON_MIMETYPE)
+        # Фильтрация, сортировка, загрузка связей и выбор полей
+        if movie_query.conditions or movie_query.order or movie_query.expanded or movie_query.selected:
+            movies = movie_service.get_filtered(movie_query)
+            return schema.dump(movies), 200
         # Без фильтрации
         all_movies = movie_service.get_all()
-        return movies_schema.dump(all_movies), 200
+        return schema.dump(all_movies), 200
 
     @admin_required
     def post(self) -> tuple:
@@ -71,6 +162,118 @@ class MoviesView(Resource):
 
         return '', 201
 
+    @admin_required
+    def patch(self) -> tuple:
+        """
+        Метод реализует отправку PATCH-запроса на /movies.
+        Тело запроса - JSON-список изменений: [{"id": 1, "genre_id": 5}, {"id": 2, "rating": 7.5}].
+        Все изменения записываются в одной транзакции, изменения с одинаковыми значениями - одним запросом.
+        :return: Отчет с результатом по каждому изменению в формате JSON и HTTP-код 200.
+        Если тело запроса не список или изменений больше BATCH_MAX_ITEMS - пустая строка и HTTP-код 400.
+        """
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or len(items) > BATCH_MAX_ITEMS:
+            abort(400)
+        return movie_service.bulk_update(items), 200
+
+    @admin_required
+    def delete(self) -> tuple:
+        """
+        Метод реализует отправку DELETE-запроса на /movies.
+        Тело запроса - JSON-список id фильмов: [1, 2, 3]. Фильмы удаляются одним запросом в одной транзакции.
+        :return: Отчет с результатом по каждому id в формате JSON и HTTP-код 200.
+        Если тело запроса не список целых чисел или их больше BATCH_MAX_ITEMS - пустая строка и HTTP-код 400.
+        """
+        ids = request.get_json(silent=True)
+        if (not isinstance(ids, list) or len(ids) > BATCH_MAX_ITEMS
+                or not all(isinstance(mid, int) and not isinstance(mid, bool) for mid in ids)):
+            abort(400)
+        return movie_service.bulk_delete(ids), 200
+
+
+@movie_ns.route('/stats')
+class MovieStatsView(Resource):
+    """
+    Class-Based View для статистики фильмов.
+    Реализовано:
+    - количество фильмов и средний рейтинг с группировкой по жанру, режиссеру и году выпуска
+    GET-запросом на /movies/stats?group_by=genre_id,year.
+    """
+
+    @auth_required
+    @conditional_get(movie_dao)
+    def get(self) -> tuple:
+        """
+        Метод реализует GET-запрос на /movies/stats.
+        Квери-параметр group_by - поля группировки через запятую (genre_id, director_id, year),
+        без него возвращается итог по всем фильмам.
+        :return: Список групп с полями группировки, count и avg_rating в формате JSON и HTTP-код 200.
+        При неизвестных полях группировки - пустая строка и HTTP-код 400.
+        """
+        group_by = tuple(dict.fromkeys(filter(None, request.args.get('group_by', '').split(','))))
+        try:
+            rows = movie_service.get_stats(group_by)
+        except ValueError:
+            abort(400)
+        return [row._asdict() for row in rows], 200
+
+
+@movie_ns.route('/search')
+class MovieSearchView(Resource):
+    """
+    Class-Based View для полнотекстового поиска фильмов.
+    Реализовано:
+    - поиск фильмов по названию и описанию GET-запросом на /movies/search?q=строка.
+    """
+
+    @auth_required
+    @conditional_get(movie_dao)
+    def get(self) -> tuple:
+        """
+        Метод реализует GET-запрос на /movies/search.
+        Квери-параметр q - поисковая строка: фильм должен содержать все слова, последнее слово ищется по префиксу.
+        Результаты упорядочены по релевантности и выводятся постранично (квери-параметры limit и cursor),
+        квери-параметр fields ограничивает возвращаемые поля.
+        :return: Страница найденных фильмов в формате JSON и HTTP-код 200.
+        Если в поисковой строке нет слов - пустая строка и HTTP-код 400.
+        """
+        fields = get_fields_param(MovieQuery.selectable)
+        after, limit = get_page_params(2) or (None, PAGE_DEFAULT_LIMIT)
+        try:
+            movies = movie_service.search(request.args.get('q', ''), after, limit + 1, fields)
+        except ValueError:
+            abort(400)
+        schema = get_movie_schema((), many=True, only=fields)
+        return make_page(movies, limit, schema, key=lambda movie: [movie.score, movie.id]), 200
+
+
+@movie_ns.route('/top')
+class MovieTopView(Resource):
+    """
+    Class-Based View для рейтинга лучших фильмов.
+    Реализовано:
+    - фильмы с наибольшим рейтингом (по всем жанрам или в жанре) GET-запросом на /movies/top?genre_id=1&limit=10.
+    """
+
+    @auth_required
+    @conditional_get(movie_dao)
+    def get(self) -> tuple:
+        """
+        Метод реализует GET-запрос на /movies/top.
+        Квери-параметры: genre_id - id жанра (без него - все жанры), limit - количество фильмов.
+        :return: Список фильмов, упорядоченный по убыванию рейтинга, в формате JSON и HTTP-код 200.
+        При некорректных параметрах - пустая строка и HTTP-код 400.
+        """
+        try:
+            limit = int(request.args.get('limit', 10))
+            genre_id = request.args.get('genre_id', type=int)
+        except ValueError:
+            abort(400)
+        if not 0 < limit <= LEADERBOARD_SIZE or ('genre_id' in request.args and genre_id is None):
+            abort(400)
+        movies = movie_service.get_top(genre_id, limit)
+        return get_movie_schema((), many=True, only=MovieQuery.selectable).dump(movies), 200
+
 
 @movie_ns.route('/<int:mid>')
 class MovieView(Resource):
@@ -79,21 +282,29 @@ class MovieView(Resource):
     Реализовано:
     - отображение данных о конкретном фильме GET-запросом на /movies/id;
     - изменение данных о конкретном фильме в БД PUT-запросом на /movies/id;
+    - частичное изменение данных о конкретном фильме в БД PATCH-запросом на /movies/id;
     - удаление фильма из БД DELETE-запросом на /movies/id.
     """
 
     @auth_required
+    @conditional_get(movie_dao, director_dao, genre_dao)
     def get(self, mid: int) -> tuple:
         """
         Метод реализует GET-запрос на /movie/id.
         :param mid: id фильма, информацию о котором нужно вытащить из БД.
+        Квери-параметр expand=director,genre добавляет вложенные данные о режиссере и жанре,
+        квери-параметр fields=id,title,year ограничивает выбираемые и возвращаемые поля.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         В случае, если id нет в базе данных - пустая строка и HTTP-код 404.
         """
-        movie = movie_service.get_one(mid)
+        expand = parse_expand()
+        fields = get_fields_param(MovieQuery.selectable)
+        if expand and fields:
+            abort(400)
+        movie = movie_service.get_one(mid, expand, fields)
         if movie is None:
             return '', 404
-        return movie_schema.dump(movie), 200
+        return get_movie_schema(expand, only=fields).dump(movie), 200
 
     @admin_required
     def put(self, mid: int) -> tuple:
@@ -110,6 +321,24 @@ class MovieView(Resource):
 
         return '', 204
 
+    @admin_required
+    def patch(self, mid: int) -> tuple:
+        """
+        Метод реализует PATCH-запрос на /movie/id.
+        В теле запроса передаются только изменяемые поля, остальные поля фильма не меняются.
+        :param mid: id фильма, информацию о котором нужно изменить в БД.
+        :return: Возвращает пустую строку и HTTP-код 204.
+        В случае, если id нет в базе данных - пустая строка и HTTP-код 404.
+        При неизвестных полях или значениях неверного типа - пустая строка и HTTP-код 400.
+        """
+        try:
+            found = movie_service.patch(mid, request.get_json(silent=True))
+        except ValidationError:
+            abort(400)
+        if not found:
+            return '', 404
+        return '', 204
+
     @admin_required
     def delete(self, mid: int) -> tuple:
         """
@@ -120,3 +349,36 @@ class MovieView(Resource):
         """
         movie_service.delete(mid)
         return '', 204
+
+
+@movie_ns.route('/<int:mid>/similar')
+class MovieSimilarView(Resource):
+    """
+    Class-Based View для рекомендаций похожих фильмов.
+    Реализовано:
+    - фильмы, похожие на конкретный фильм (жанр, режиссер, близость года выпуска и рейтинг),
+    GET-запросом на /movies/id/similar?limit=10.
+    """
+
+    @auth_required
+    @conditional_get(movie_dao)
+    def get(self, mid: int) -> tuple:
+        """
+        Метод реализует GET-запрос на /movies/id/similar.
+        Квери-параметр limit - количество фильмов.
+        :param mid: id фильма в базе данных.
+        :return: Список похожих фильмов с оценкой похожести (поле score) по убыванию оценки
+        в формате JSON и HTTP-код 200. При некорректном limit - пустая строка и HTTP-код 400.
+        При отсутствии фильма - пустая строка и HTTP-код 404.
+        """
+        try:
+            limit = int(request.args.get('limit', SIMILAR_DEFAULT_LIMIT))
+        except ValueError:
+            abort(400)
+        if not 0 < limit <= SIMILAR_MAX_LIMIT:
+            abort(400)
+        found = similar_service.similar(mid, limit)
+        if found is None:
+            return '', 404
+        schema = get_movie_schema((), only=MovieQuery.selectable)
+        return [dict(schema.dump(movie), score=round(score, 4)) for movie, score in found], 200
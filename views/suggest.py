@@ -0,0 +1,39 @@
+from flask import request, abort
+from flask_restx import Namespace, Resource
+
+from constants import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT
+from helpers import auth_required
+from implemented import suggest_service
+
+suggest_ns = Namespace('suggest')
+
+
+@suggest_ns.route('/')
+class SuggestView(Resource):
+    """
+    Class-Based View для подсказок при вводе.
+    Реализовано:
+    - подсказки по названиям фильмов, именам режиссеров и названиям жанров
+    GET-запросом на /suggest?prefix=...&kind=movie|director|genre.
+    """
+
+    @auth_required
+    def get(self) -> tuple:
+        """
+        Метод реализует отправку GET-запроса на /suggest.
+        Квери-параметры: prefix - введенный текст, kind - тип подсказки (movie, director или genre),
+        limit - максимальное количество подсказок.
+        :return: Список подсказок (id и название) в формате JSON и HTTP-код 200.
+        При некорректных параметрах - пустая строка и HTTP-код 400.
+        """
+        prefix = request.args.get('prefix', '').strip()
+        try:
+            limit = int(request.args.get('limit', SUGGEST_DEFAULT_LIMIT))
+        except ValueError:
+            abort(400)
+        if not prefix or not 0 < limit <= SUGGEST_MAX_LIMIT:
+            abort(400)
+        try:
+            return suggest_service.suggest(request.args.get('kind', 'movie'), prefix, limit), 200
+        except ValueError:
+            abort(400)
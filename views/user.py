@@ -1,7 +1,10 @@
-from flask import request
+from flask import request, abort
 from flask_restx import Namespace, Resource
+from marshmallow import ValidationError
 
+from helpers import get_page_params, make_page
 from implemented import user_service
+from service.password import PasswordHasherBusy
 from dao.model.user import UserSchema
 
 user_ns = Namespace('users')
@@ -21,8 +24,15 @@ class UsersView(Resource):
     def get(self):
         """
         Метод реализует отправку GET-запроса на /users.
+        Поддерживается постраничный вывод с использованием квери-параметров limit, after_id и cursor.
         :return: Сериализованные данные в формате JSON и HTTP-код 200.
         """
+        page_params = get_page_params()
+        if page_params is not None:
+            after, limit = page_params
+            page = user_service.get_page(after, limit + 1)
+            return make_page(page, limit, users_schema), 200
+
         all_users = user_service.get_all()
         return users_schema.dump(all_users), 200
 
@@ -44,6 +54,7 @@ class UserView(Resource):
     Class-Based View для отображения конкретного пользователя из БД.
     Реализовано:
     - отображение данных о конкретном пользователе GET-запросом на /users/id;
+    - частичное изменение данных о конкретном пользователе PATCH-запросом на /users/id;
     """
     def get(self, uid):
         """
@@ -71,6 +82,26 @@ class UserView(Resource):
 
         return '', 204
 
+    def patch(self, uid: int) -> tuple:
+        """
+        Метод реализует отправку PATCH-запроса на /users/id.
+        В теле запроса передаются только изменяемые поля, остальные поля пользователя не меняются.
+        :param uid: id пользователя, информацию о котором нужно изменить в БД.
+        :return: Возвращает пустую строку и HTTP-код 204.
+        В случае, если id нет в базе данных - пустая строка и HTTP-код 404.
+        При неизвестных полях или значениях неверного типа - пустая строка и HTTP-код 400.
+        Если очередь задач хеширования паролей заполнена - HTTP-код 503.
+        """
+        try:
+            found = user_service.patch(uid, request.get_json(silent=True))
+        except ValidationError:
+            abort(400)
+        except PasswordHasherBusy:
+            return '', 503, {'Retry-After': '1'}
+        if not found:
+            return '', 404
+        return '', 204
+
     def delete(self, uid: int) -> tuple:
         """
         Метод реализует отправку DELETE-запроса на /users/id.